@@ -1,6 +1,21 @@
 from sys import argv
 import cloudylang.interpreter as cloudy
 
+# Report where type inference failed instead of running the script
+type_report = "--type-report" in argv
+if type_report:
+    argv.remove("--type-report")
+
+# Keep the script's type feedback in a .profile file next to it between runs
+if "--persist-profile" in argv:
+    argv.remove("--persist-profile")
+    cloudy.interpreter.persist_profiles = True
+
+# Write the parsed script to ast.json in the working directory
+if "--dump-ast" in argv:
+    argv.remove("--dump-ast")
+    cloudy.interpreter.ast_dump_path = "ast.json"
+
 if len(argv) <= 1:
     import shell
 
@@ -20,7 +35,12 @@ else:
         print(e, "\n Failed to load script.")
 
     else:
-        _, error = cloudy.run(fn, script)
+        if type_report:
+            report, error = cloudy.type_report(fn, script)
+        else:
+            _, error = cloudy.run(fn, script)
 
         if error:
             print(error)
+        elif type_report:
+            print("\n".join(report))
@@ -0,0 +1,254 @@
+import operator
+from array import array
+from itertools import compress, repeat
+
+from .coretypes import Bool, DataType, NewNum, Number
+from ..utils.errors import RTError
+from ..utils.utils import TT
+
+# Arrays pack numbers into a python array, as 64 bit ints, doubles or the
+# booleans comparisons make. Element-wise operations map an operator function
+# over the packed values, so the loop runs natively and no cloudy value is
+# made per element; a scalar operand is repeated to the array's length.
+
+INT = "q"
+FLOAT = "d"
+BOOL = "b"
+
+ARITHMETIC = {
+    TT.PLUS: operator.add,
+    TT.MINUS: operator.sub,
+    TT.MULT: operator.mul,
+    TT.DIV: operator.truediv,
+    TT.FDIV: operator.floordiv,
+    TT.MODU: operator.mod,
+    TT.POW: operator.pow,
+}
+COMPARISONS = {
+    TT.EE: operator.eq,
+    TT.NE: operator.ne,
+    TT.LT: operator.lt,
+    TT.GT: operator.gt,
+    TT.LTE: operator.le,
+    TT.GTE: operator.ge,
+}
+ARRAY_OPS = {**ARITHMETIC, **COMPARISONS}
+
+ZERO_ERRORS = {
+    TT.DIV: "Division by zero",
+    TT.FDIV: "Division by zero",
+    TT.MODU: "Modulo by zero",
+}
+
+
+def typecode_of(values) -> str:
+    # The narrowest typecode holding every raw value
+    if all(type(value) is bool for value in values):
+        return BOOL if values else INT
+    if any(type(value) is float for value in values):
+        return FLOAT
+    return INT
+
+
+class Array(DataType):
+    def __init__(self, values: array):
+        super().__init__()
+        self.values = values
+
+    def bin_op(self, op, other, reflected: bool = False):
+        # self op other, or other op self when reflected
+        if isinstance(other, Array):
+            if len(other.values) != len(self.values):
+                return None, RTError(
+                    other.pos_start,
+                    other.pos_end,
+                    "Arrays must have the same length",
+                    self.context,
+                )
+            values = other.values
+            other_type = other.values.typecode
+        elif isinstance(other, (Number, Bool)):
+            values = repeat(other.value)
+            other_type = FLOAT if type(other.value) is float else INT
+        else:
+            return None, self.illegal_operation(other)
+
+        left, right = (values, self.values) if reflected else (self.values, values)
+        func = ARRAY_OPS[op]
+
+        if op in COMPARISONS:
+            return Array(array(BOOL, map(func, left, right))), None
+
+        # The right operand divides or is the exponent; a scalar is checked once
+        if reflected:
+            divisor = self.values
+        elif isinstance(other, Array):
+            divisor = values
+        else:
+            divisor = (other.value,)
+
+        if op in ZERO_ERRORS and 0 in divisor:
+            return None, RTError(
+                other.pos_start, other.pos_end, ZERO_ERRORS[op], self.context
+            )
+
+        if op == TT.DIV or FLOAT in (self.values.typecode, other_type):
+            typecode = FLOAT
+        elif op == TT.POW and divisor and min(divisor) < 0:
+            # Negative integer exponents give floats
+            typecode = FLOAT
+        else:
+            typecode = INT
+
+        try:
+            result = array(typecode, map(func, left, right))
+        except OverflowError:
+            return None, RTError(
+                other.pos_start,
+                other.pos_end,
+                "Numeric result out of range",
+                self.context,
+            )
+        except ZeroDivisionError:
+            # Zero to a negative power
+            return None, RTError(
+                other.pos_start, other.pos_end, "Division by zero", self.context
+            )
+        except TypeError:
+            # Complex powers of negative numbers
+            return None, RTError(
+                other.pos_start,
+                other.pos_end,
+                "Result is not a real number",
+                self.context,
+            )
+
+        return Array(result), None
+
+    def add(self, other):
+        return self.bin_op(TT.PLUS, other)
+
+    def sub(self, other):
+        return self.bin_op(TT.MINUS, other)
+
+    def mul(self, other):
+        return self.bin_op(TT.MULT, other)
+
+    def truedive(self, other):
+        return self.bin_op(TT.DIV, other)
+
+    def floordiv(self, other):
+        return self.bin_op(TT.FDIV, other)
+
+    def mod(self, other):
+        return self.bin_op(TT.MODU, other)
+
+    def pow(self, other):
+        return self.bin_op(TT.POW, other)
+
+    def eq(self, other):
+        return self.bin_op(TT.EE, other)
+
+    def ne(self, other):
+        return self.bin_op(TT.NE, other)
+
+    def lt(self, other):
+        return self.bin_op(TT.LT, other)
+
+    def gt(self, other):
+        return self.bin_op(TT.GT, other)
+
+    def lte(self, other):
+        return self.bin_op(TT.LTE, other)
+
+    def gte(self, other):
+        return self.bin_op(TT.GTE, other)
+
+    def neg(self):
+        typecode = FLOAT if self.values.typecode == FLOAT else INT
+        return Array(array(typecode, map(operator.neg, self.values))), None
+
+    def in_(self, other):
+        if isinstance(other, (Number, Bool)):
+            return Bool(other.value in self.values), None
+        return Bool(False), None
+
+    def not_in(self, other):
+        if isinstance(other, (Number, Bool)):
+            return Bool(other.value not in self.values), None
+        return Bool(True), None
+
+    def select(self, index: "Array"):
+        # A boolean mask keeps the elements where it is true; an int array
+        # gathers the elements at its indexes
+        values = self.values
+
+        if index.values.typecode == BOOL:
+            if len(index.values) != len(values):
+                return None, RTError(
+                    index.pos_start,
+                    index.pos_end,
+                    "Mask must have the same length as the array",
+                    self.context,
+                )
+            selected = compress(values, index.values)
+            return Array(array(values.typecode, selected)), None
+
+        if index.values.typecode != INT:
+            return None, RTError(
+                index.pos_start,
+                index.pos_end,
+                "Index arrays can only hold ints",
+                self.context,
+            )
+
+        try:
+            gathered = array(values.typecode, map(values.__getitem__, index.values))
+        except IndexError:
+            return None, RTError(
+                index.pos_start, index.pos_end, "Array index out of range", self.context
+            )
+
+        return Array(gathered), None
+
+    def store(self, idx: Number, value: DataType):
+        # Stores a raw value, as long as the array's typecode can hold it
+        typecode = self.values.typecode
+        if (
+            not isinstance(value, (Number, Bool))
+            or (typecode != FLOAT and type(value.value) is float)
+            or (typecode == BOOL and type(value.value) is not bool)
+        ):
+            return f"Cannot store {type(value).__name__.lower()} in {self.kind} array"
+
+        try:
+            self.values[idx.value] = value.value
+        except OverflowError:
+            return "Numeric result out of range"
+
+    def box(self, value):
+        return Bool(value) if self.values.typecode == BOOL else NewNum(value)
+
+    @property
+    def kind(self) -> str:
+        return {INT: "int", FLOAT: "float", BOOL: "bool"}[self.values.typecode]
+
+    def copy(self):
+        return (
+            Array(self.values)
+            .set_context(self.context)
+            .set_pos(self.pos_start, self.pos_end)
+        )
+
+    def is_index(self, idx: Number):
+        return -len(self.values) <= idx.value < len(self.values)
+
+    def __getitem__(self, idx: Number):
+        return self.box(self.values[idx.value])
+
+    def __repr__(self):
+        return f"array([{', '.join(map(repr, map(self.box, self.values)))}])"
+
+    def __iter__(self):
+        for value in self.values:
+            yield self.box(value), None
@@ -1,6 +1,11 @@
-from ..utils.utils import Position
+import operator
+
+from ..utils.utils import Position, int_to_str
 from ..utils.errors import RTError
 
+# Hash key of values that cannot be put in a set
+UNHASHABLE = object()
+
 
 class DataType:
     def __init__(self):
@@ -29,6 +34,11 @@ class DataType:
     def is_true(self):
         return False
 
+    def hash_key(self):
+        # What stands in for the value in a python dict or set; values that
+        # are equal in cloudy must have equal keys
+        return UNHASHABLE
+
     def illegal_operation(self, other=None):
         if not other:
             other = self
@@ -85,93 +95,112 @@ class DataType:
     def not_(self):
         return None, self.illegal_operation()
 
-    def __neg__(self):
+    def neg(self):
         return None, self.illegal_operation()
 
     def __iter__(self):
-        return None, self.illegal_operation()
+        yield None, self.illegal_operation()
+
+
+class Primitive(DataType):
+    # Primitive values are immutable and may be shared, so they carry no
+    # position or context of their own; the interpreter attaches those to
+    # any error raised by their operations.
+    pos_start = None
+    pos_end = None
+    context = None
+
+    def __init__(self, *args):
+        pass
+
+    def set_pos(self, pos_start: Position = None, pos_end: Position = None):
+        return self
+
+    def set_context(self, context=None):
+        return self
+
+    def copy(self):
+        return self
+
+    def hash_key(self):
+        # The raw value hashes and compares as cloudy does, 1 == 1.0 == true
+        return self.value
 
 
 class NewNum:
     def __new__(cls, value):
-        if "." in str(value):
+        if type(value) is float:
             return Float(value)
-        else:
-            return Int(value)
+        return Int(int(value))
 
 
-class Number(DataType):
-    def __init__(self, value: int):
+class Number(Primitive):
+    def __new__(cls, value: int):
+        self = super().__new__(cls)
         self.value = value
-        super().__init__()
-
-    def copy(self):
-        return (
-            NewNum(self.value)
-            .set_context(self.context)
-            .set_pos(self.pos_start, self.pos_end)
-        )
+        return self
 
     @property
     def is_float(self):
-        return "." in str(self.value)
+        return type(self.value) is float
 
-    def add(self, other):
-        if isinstance(other, (Number, Bool)):
-            return NewNum(self.value + other.value).set_context(self.context), None
-        else:
-            return None, DataType.illegal_operation(other)
-
-    def sub(self, other):
-        if isinstance(other, (Number, Bool)):
-            return NewNum(self.value - other.value).set_context(self.context), None
-        else:
-            return None, DataType.illegal_operation(other)
-
-    def mul(self, other):
-        if isinstance(other, (Number, Bool)):
-            return NewNum(self.value * other.value).set_context(self.context), None
-        else:
-            return None, DataType.illegal_operation(other)
-
-    def truedive(self, other):
+    def arith(self, other, op, zero_error: str = None):
         if not isinstance(other, (Number, Bool)):
             return None, DataType.illegal_operation(other)
 
-        if other.value == 0:
+        if zero_error and other.value == 0:
             return None, RTError(
-                other.pos_start, other.pos_end, "Division by zero", self.context
+                other.pos_start, other.pos_end, zero_error, self.context
             )
-        return NewNum(self.value / other.value).set_context(self.context), None
 
-    def floordiv(self, other):
-        if not isinstance(other, (Number, Bool)):
-            return None, DataType.illegal_operation(other)
-
-        if other.value == 0:
+        try:
+            result = op(self.value, other.value)
+        except OverflowError:
+            return None, RTError(
+                other.pos_start,
+                other.pos_end,
+                "Numeric result out of range",
+                self.context,
+            )
+        except ZeroDivisionError:
+            # Zero to a negative power
             return None, RTError(
                 other.pos_start, other.pos_end, "Division by zero", self.context
             )
-        return NewNum(self.value // other.value).set_context(self.context), None
-
-    def mod(self, other):
-        if not isinstance(other, (Number, Bool)):
-            return None, DataType.illegal_operation(other)
 
-        if other.value == 0:
+        if type(result) is complex:
             return None, RTError(
-                other.pos_start, other.pos_end, "Modulo by zero", self.context
+                other.pos_start,
+                other.pos_end,
+                "Result is not a real number",
+                self.context,
             )
-        return NewNum(self.value % other.value).set_context(self.context), None
 
-    def __neg__(self):
-        return NewNum(-self.value)
+        return NewNum(result), None
+
+    def add(self, other):
+        return self.arith(other, operator.add)
+
+    def sub(self, other):
+        return self.arith(other, operator.sub)
+
+    def mul(self, other):
+        return self.arith(other, operator.mul)
+
+    def truedive(self, other):
+        return self.arith(other, operator.truediv, "Division by zero")
+
+    def floordiv(self, other):
+        return self.arith(other, operator.floordiv, "Division by zero")
+
+    def mod(self, other):
+        return self.arith(other, operator.mod, "Modulo by zero")
+
+    def neg(self):
+        return NewNum(-self.value), None
 
     def pow(self, other):
-        if isinstance(other, (Number, Bool)):
-            return NewNum(self.value ** other.value).set_context(self.context), None
-        else:
-            return None, DataType.illegal_operation(other)
+        return self.arith(other, operator.pow)
 
     def eq(self, other):
         if isinstance(other, (Number, Bool)):
@@ -233,7 +262,7 @@ class Number(DataType):
     def or_(self, other):
         if isinstance(other, (Number, Bool)):
             return (
-                bool(self.value or other.value).set_context(self.context),
+                Bool(self.value or other.value).set_context(self.context),
                 None,
             )
         else:
@@ -243,25 +272,28 @@ class Number(DataType):
         return Bool(not self.value).set_context(self.context), None
 
     def __repr__(self):
+        if type(self.value) is int:
+            return int_to_str(self.value)
         return str(self.value)
 
 
 class Float(Number):
-    def __init__(self, value):
-        super().__init__(value)
+    pass
 
 
 class Int(Number):
-    def __init__(self, value):
-        super().__init__(value)
+    def __new__(cls, value):
+        if type(value) is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return SMALL_INTS[value - SMALL_INT_MIN]
+        return super().__new__(cls, value)
 
 
-class Null(DataType):
-    def __init__(self):
-        super().__init__()
+class Null(Primitive):
+    def __new__(cls):
+        return NULL
 
-    def copy(self):
-        return Null()
+    def hash_key(self):
+        return None
 
     def eq(self, other):
         if isinstance(other, Null):
@@ -275,68 +307,39 @@ class Null(DataType):
         else:
             return Bool(True).set_context(self.context), None
 
-    def not_(self, other):
+    def not_(self):
         return Bool(True).set_context(self.context), None
 
     def __repr__(self):
         return "null"
 
 
-class Bool(DataType):
-    def __init__(self, value: bool):
-        self.value = value
-        super().__init__()
+class Bool(Primitive):
+    def __new__(cls, value: bool):
+        return TRUE if value else FALSE
+
+    arith = Number.arith
 
     def add(self, other):
-        if isinstance(other, (Number, Bool)):
-            return NewNum(self.value + other.value).set_context(self.context), None
-        else:
-            return None, DataType.illegal_operation(other)
+        return self.arith(other, operator.add)
 
     def sub(self, other):
-        if isinstance(other, (Number, Bool)):
-            return NewNum(self.value - other.value).set_context(self.context), None
-        else:
-            return None, DataType.illegal_operation(other)
+        return self.arith(other, operator.sub)
 
     def mul(self, other):
-        if isinstance(other, (Number, Bool)):
-            return NewNum(self.value * other.value).set_context(self.context), None
-        else:
-            return None, DataType.illegal_operation(other)
+        return self.arith(other, operator.mul)
 
     def truedive(self, other):
-        if not isinstance(other, (Number, Bool)):
-            return None, DataType.illegal_operation(other)
-
-        if other.value == 0:
-            return None, RTError(
-                other.pos_start, other.pos_end, "Division by zero", self.context
-            )
-        return NewNum(self.value / other.value).set_context(self.context), None
+        return self.arith(other, operator.truediv, "Division by zero")
 
     def floordiv(self, other):
-        if not isinstance(other, (Number, Bool)):
-            return None, DataType.illegal_operation(other)
-
-        if other.value == 0:
-            return None, RTError(
-                other.pos_start, other.pos_end, "Division by zero", self.context
-            )
-        return NewNum(self.value // other.value).set_context(self.context), None
+        return self.arith(other, operator.floordiv, "Division by zero")
 
     def mod(self, other):
-        if not isinstance(other, (Number, Bool)):
-            return None, DataType.illegal_operation(other)
-
-        if other.value == 0:
-            return None, RTError(
-                other.pos_start, other.pos_end, "Modulo by zero", self.context
-            )
-        return NewNum(self.value % other.value).set_context(self.context), None
+        return self.arith(other, operator.mod, "Modulo by zero")
 
-    def __neg__(self):
-        return NewNum(-self.value)
+    def neg(self):
+        return NewNum(-self.value), None
 
     def pow(self, other):
         return None, DataType.illegal_operation(other)
@@ -401,7 +404,7 @@ class Bool(DataType):
     def or_(self, other):
         if isinstance(other, (Number, Bool)):
             return (
-                bool(self.value or other.value).set_context(self.context),
+                Bool(self.value or other.value).set_context(self.context),
                 None,
             )
         else:
@@ -413,21 +416,17 @@ class Bool(DataType):
     def is_true(self):
         return self.value
 
-    def copy(self):
-        return (
-            Bool(self.value)
-            .set_context(self.context)
-            .set_pos(self.pos_start, self.pos_end)
-        )
-
     def __repr__(self):
         return str(self.value).lower()
 
 
-class String(DataType):
-    def __init__(self, value):
-        super().__init__()
+class String(Primitive):
+    def __new__(cls, value):
+        if len(value) <= 1 and value in SHORT_STRINGS:
+            return SHORT_STRINGS[value]
+        self = super().__new__(cls)
         self.value = value
+        return self
 
     def add(self, other):
         if isinstance(other, String):
@@ -465,20 +464,11 @@ class String(DataType):
 
         return None, DataType.illegal_operation(other)
 
-    def copy(self):
-        return (
-            String(self.value)
-            .set_context(self.context)
-            .set_pos(self.pos_start, self.pos_end)
-        )
-
     def is_index(self, idx: Number):
         return -len(self.value) <= idx.value < len(self.value)
 
     def __getitem__(self, idx: Number):
-        val = self.copy()
-        val.value = self.value[idx.value]
-        return val
+        return String(self.value[idx.value])
 
     def __repr__(self) -> str:
         return f"{self.value!r}"
@@ -487,5 +477,25 @@ class String(DataType):
         return self.value
 
     def __iter__(self):
-        for i in range(len(self.value)):
-            yield String(self.value[i]).set_context(self.context), None
\ No newline at end of file
+        for char in self.value:
+            yield String(char), None
+
+
+# Shared instances
+
+SMALL_INT_MIN = -128
+SMALL_INT_MAX = 1024
+
+
+def _make(cls, value):
+    self = Primitive.__new__(cls)
+    self.value = value
+    return self
+
+
+NULL = Primitive.__new__(Null)
+TRUE = _make(Bool, True)
+FALSE = _make(Bool, False)
+SMALL_INTS = tuple(_make(Int, i) for i in range(SMALL_INT_MIN, SMALL_INT_MAX + 1))
+SHORT_STRINGS = {char: _make(String, char) for char in map(chr, range(256))}
+SHORT_STRINGS[""] = _make(String, "")
@@ -1,4 +1,5 @@
-from .coretypes import Bool, DataType, Int, Number, String
+from .coretypes import UNHASHABLE, Bool, DataType, Float, Int, Number, String
+from .unboxed import box
 from ..utils.errors import RTError
 from ..utils.utils import Context, RTResult, SymbolTable
 
@@ -138,19 +139,17 @@ class List(DataType):
 
 
 class Dict(DataType):
+    # pairs maps the hash key of every key to its value; boxing a hash key
+    # gives the key back
     def __init__(self, pairs: dict):
         super().__init__()
         self.pairs = pairs
 
     def in_(self, other):
-        if isinstance(other, String):
-            return Bool(other.value in self.pairs), None
-        return Bool(False).set_context(self.context), None
+        return Bool(other.hash_key() in self.pairs), None
 
     def not_in(self, other):
-        if isinstance(other, String):
-            return Bool(other.value not in self.pairs), None
-        return Bool(True).set_context(self.context), None
+        return Bool(other.hash_key() not in self.pairs), None
 
     def copy(self):
         return (
@@ -160,28 +159,217 @@ class Dict(DataType):
         )
 
     def __repr__(self):
-        return f"{self.pairs!r}"
+        pairs = (f"{box(key)!r}: {value!r}" for key, value in self.pairs.items())
+        return "{" + ", ".join(pairs) + "}"
 
     def __iter__(self):
-        for i in range(len(self.pairs.keys())):
-            yield String(self.pairs.keys()[i]).set_context(self.context), None
+        # Keys are taken up front, so the loop body may add or delete them
+        for key in list(self.pairs):
+            yield box(key), None
+
+
+class LazyIterable(DataType):
+    # Values produced as they are iterated, by running cloudy code or reading
+    # a live container; the errors it yields are runtime errors to report as
+    # they are
+    def copy(self):
+        return self
+
+
+class DictView(LazyIterable):
+    # A live view of the keys, values or pairs of a dict, in insertion order
+    name = None
+
+    def __init__(self, dict_: Dict):
+        super().__init__()
+        self.dict = dict_
+
+    def in_(self, other):
+        return Bool(self.contains(other)), None
+
+    def not_in(self, other):
+        return Bool(not self.contains(other)), None
+
+    def __iter__(self):
+        try:
+            yield from self.entries()
+        except RuntimeError:
+            yield None, RTError(
+                self.pos_start,
+                self.pos_end,
+                "Dict changed size during iteration",
+                self.context,
+            )
+
+    def __repr__(self):
+        values = ", ".join(repr(value) for value, _ in self.entries())
+        return f"{self.name}([{values}])"
+
+
+class KeysView(DictView):
+    name = "keys"
+
+    def contains(self, value: DataType) -> bool:
+        return value.hash_key() in self.dict.pairs
+
+    def entries(self):
+        for key in self.dict.pairs:
+            yield box(key), None
+
+
+class ValuesView(DictView):
+    name = "values"
+
+    def contains(self, value: DataType) -> bool:
+        return any(same_value(value, other) for other in self.dict.pairs.values())
+
+    def entries(self):
+        for value in self.dict.pairs.values():
+            yield value, None
+
+
+class ItemsView(DictView):
+    name = "items"
+
+    def contains(self, value: DataType) -> bool:
+        # Pairs are two element lists, [key, value]
+        if not isinstance(value, List) or len(value.elements) != 2:
+            return False
+
+        key, pair_value = value.elements
+        pairs = self.dict.pairs
+        hash_key = key.hash_key()
+        return hash_key in pairs and same_value(pair_value, pairs[hash_key])
+
+    def entries(self):
+        for key, value in self.dict.pairs.items():
+            yield List([box(key), value]), None
+
+
+def same_value(a: DataType, b: DataType) -> bool:
+    # Hashable values are equal when their keys are, anything else only to
+    # itself
+    if a is b:
+        return True
+    key = a.hash_key()
+    return key is not UNHASHABLE and key == b.hash_key()
+
+
+class Set(DataType):
+    # Hashable values without duplicates; elements maps the hash key of every
+    # value to the value itself, in insertion order
+    def __init__(self, elements: dict):
+        super().__init__()
+        self.elements = elements
+
+    def in_(self, other):
+        return Bool(other.hash_key() in self.elements), None
+
+    def not_in(self, other):
+        return Bool(other.hash_key() not in self.elements), None
+
+    def union(self, other):
+        return Set({**self.elements, **other.elements})
+
+    def intersection(self, other):
+        elements = other.elements
+        return Set({k: v for k, v in self.elements.items() if k in elements})
+
+    def difference(self, other):
+        elements = other.elements
+        return Set({k: v for k, v in self.elements.items() if k not in elements})
+
+    def copy(self):
+        return (
+            Set(self.elements)
+            .set_context(self.context)
+            .set_pos(self.pos_start, self.pos_end)
+        )
+
+    def __repr__(self):
+        if not self.elements:
+            return "set()"
+        return "{" + ", ".join(map(repr, self.elements.values())) + "}"
+
+    def __iter__(self):
+        # Values are taken up front, so the loop body may add or remove them
+        for value in list(self.elements.values()):
+            yield value, None
 
 
 class Range(DataType):
+    # An immutable sequence of ints; values is the python range they are
+    # computed from on demand, so no range is ever stored element by element
     def __init__(self, start: Number, end: Number, step: Number):
         super().__init__()
         self.start = start
         self.end = end
         self.step = step or Int(1)
+        self.values = range(start.value, end.value, self.step.value)
+
+    def eq(self, other):
+        # Ranges holding the same values are equal, as their hash keys are
+        if isinstance(other, Range):
+            return Bool(self.values == other.values).set_context(self.context), None
+        else:
+            return Bool(False).set_context(self.context), None
+
+    def ne(self, other):
+        if isinstance(other, Range):
+            return Bool(self.values != other.values).set_context(self.context), None
+        else:
+            return Bool(True).set_context(self.context), None
+
+    def in_(self, other):
+        return Bool(self.contains(other)), None
+
+    def not_in(self, other):
+        return Bool(not self.contains(other)), None
+
+    def contains(self, value: DataType) -> bool:
+        # Membership of an int in a python range is arithmetic, not a scan.
+        # Bools count as 0 and 1, as they do when hashed
+        if isinstance(value, (Int, Bool)):
+            return value.value in self.values
+        if isinstance(value, Float):
+            return value.value.is_integer() and int(value.value) in self.values
+        return False
+
+    @property
+    def length(self) -> int:
+        # len() of a python range overflows past sys.maxsize, so the count is
+        # worked out with python ints instead
+        values = self.values
+        return max(0, -((values.start - values.stop) // values.step))
+
+    def is_index(self, idx: Number):
+        return -self.length <= idx.value < self.length
+
+    def __getitem__(self, idx: Number):
+        return Int(self.values[idx.value])
+
+    def slice(self, start: int, end: int):
+        values = self.values[start:end]
+        return Range(Int(values.start), Int(values.stop), Int(values.step))
 
     def __iter__(self):
-        i = self.start.value
-        while i < self.end.value:
-            yield Number(i).set_context(self.context), None
-            i += self.step.value
+        for i in self.values:
+            yield Int(i), None
+
+    def hash_key(self):
+        # Ranges are immutable, so they are their own key
+        return self
+
+    def __eq__(self, other):
+        return isinstance(other, Range) and self.values == other.values
+
+    def __hash__(self):
+        # Python ranges hash by the values they hold
+        return hash(self.values)
 
     def copy(self):
         return Range(self.start, self.end, self.step).set_context(self.context)
 
     def __repr__(self):
-        return f"<range {self.start}..{self.end}{f'!{self.step}' if self.step else ''}>"
+        step = f"!{self.step}" if self.step.value != 1 else ""
+        return f"<range {self.start}..{self.end}{step}>"
@@ -0,0 +1,129 @@
+import operator
+
+from .coretypes import Bool, DataType, Float, Int, Null, String
+from ..utils.utils import TT
+
+# Unboxed values are plain python objects standing in for cloudy primitives:
+#   int -> Int, float -> Float, bool -> Bool, str -> String, None -> Null
+# Anything else is a regular DataType and is passed through untouched.
+
+BOXES = {int: Int, float: Float, bool: Bool, str: String}
+PRIMITIVES = (Int, Float, Bool, String)
+
+NUMERIC = (int, float, bool)
+NONE = type(None)
+
+
+def box(value):
+    box_type = BOXES.get(type(value))
+    if box_type is not None:
+        return box_type(value)
+    if value is None:
+        return Null()
+    return value
+
+
+def unbox(value: DataType):
+    if isinstance(value, PRIMITIVES):
+        return value.value
+    if isinstance(value, Null):
+        return None
+    return value
+
+
+def is_true(value):
+    if value is True:
+        return True
+    if isinstance(value, DataType):
+        return value.is_true()
+    return False
+
+
+def _nonzero(op):
+    # Returning NotImplemented sends the operation down the boxed path, which
+    # owns the error reporting for division by zero.
+    def divide(a, b):
+        if b == 0:
+            return NotImplemented
+        return op(a, b)
+
+    return divide
+
+
+def _real_pow(a, b):
+    # Zero to a negative power divides by zero
+    try:
+        result = a ** b
+    except ZeroDivisionError:
+        return NotImplemented
+    if type(result) is complex:
+        return NotImplemented
+    return result
+
+
+def _identity(a):
+    return a
+
+
+def _table(types_a, types_b, func):
+    return {(a, b): func for a in types_a for b in types_b}
+
+
+ALL_TYPES = (int, float, bool, str, NONE)
+
+BINARY_OPS = {
+    TT.PLUS: {
+        **_table(NUMERIC, NUMERIC, operator.add),
+        (str, str): operator.add,
+    },
+    TT.MINUS: _table(NUMERIC, NUMERIC, operator.sub),
+    TT.MULT: {
+        **_table(NUMERIC, NUMERIC, operator.mul),
+        (str, int): operator.mul,
+    },
+    TT.DIV: _table(NUMERIC, NUMERIC, _nonzero(operator.truediv)),
+    TT.FDIV: _table(NUMERIC, NUMERIC, _nonzero(operator.floordiv)),
+    TT.MODU: _table(NUMERIC, NUMERIC, _nonzero(operator.mod)),
+    TT.POW: _table((int, float), NUMERIC, _real_pow),
+    TT.EE: {
+        **_table(NUMERIC, NUMERIC, operator.eq),
+        **_table((str,), ALL_TYPES, operator.eq),
+        **_table((NONE,), ALL_TYPES, operator.is_),
+    },
+    TT.NE: {
+        **_table((int, float), ALL_TYPES, operator.ne),
+        **_table((bool,), NUMERIC, operator.ne),
+        **_table((str,), ALL_TYPES, operator.ne),
+        **_table((NONE,), ALL_TYPES, operator.is_not),
+    },
+    TT.LT: _table(NUMERIC, NUMERIC, operator.lt),
+    TT.GT: _table(NUMERIC, NUMERIC, operator.gt),
+    TT.LTE: _table((int, float), NUMERIC, operator.le),
+    TT.GTE: _table((int, float), NUMERIC, operator.ge),
+    # Membership operands are looked up as (element, container)
+    TT.IN: {(str, str): lambda a, b: a in b},
+    TT.NOT_IN: {(str, str): lambda a, b: a not in b},
+    "and": _table(NUMERIC, NUMERIC, lambda a, b: bool(a and b)),
+    "or": _table(NUMERIC, NUMERIC, lambda a, b: bool(a or b)),
+}
+
+# Same-type numeric operands skip the pair lookup entirely
+FAST_OPS = {
+    num_type: {
+        op: table[num_type, num_type]
+        for op, table in BINARY_OPS.items()
+        if (num_type, num_type) in table
+    }
+    for num_type in (int, float)
+}
+
+UNARY_OPS = {
+    TT.PLUS: {int: _identity, float: _identity, bool: _identity},
+    TT.MINUS: {int: operator.neg, float: operator.neg, bool: operator.neg},
+    "not": {
+        int: operator.not_,
+        float: operator.not_,
+        bool: operator.not_,
+        NONE: operator.not_,
+    },
+}
@@ -0,0 +1,427 @@
+from .utils.nodes import *
+from .utils.utils import TT
+from .datatypes.derivedtypes import List
+from .datatypes.unboxed import BINARY_OPS, UNARY_OPS
+from .resolver import LOCAL
+
+# Flow-sensitive type inference over the locals of every function.
+#
+# Types are the unboxed python types (int, float, bool, str) or List for
+# lists. An environment maps the frame slots of the function being inferred
+# to the type they are known to hold at that point; a slot missing from it
+# may hold anything or nothing at all. Only plain LOCAL slots are tracked:
+# nothing but the function itself can rebind them, whereas globals may be
+# rebound by any call.
+#
+# Operator nodes whose operand types are proven become Typed* nodes, which
+# the interpreter evaluates without checking types. Top level code works on
+# globals and is left to quickening.
+
+# Environment of code that cannot be reached, such as after a return
+DEAD = None
+
+ARITHMETIC = {TT.PLUS, TT.MINUS, TT.MULT, TT.FDIV, TT.MODU}
+PREDICATES = {
+    TT.EE,
+    TT.NE,
+    TT.LT,
+    TT.GT,
+    TT.LTE,
+    TT.GTE,
+    TT.IN,
+    TT.NOT_IN,
+    "and",
+    "or",
+}
+
+OP_SYMBOLS = {
+    TT.PLUS: "+",
+    TT.MINUS: "-",
+    TT.MULT: "*",
+    TT.DIV: "/",
+    TT.FDIV: "//",
+    TT.MODU: "%",
+    TT.POW: "**",
+    TT.EE: "==",
+    TT.NE: "!=",
+    TT.LT: "<",
+    TT.GT: ">",
+    TT.LTE: "<=",
+    TT.GTE: ">=",
+    TT.IN: "in",
+    TT.NOT_IN: "not in",
+}
+
+
+def join(env_a: dict, env_b: dict) -> dict:
+    if env_a is DEAD:
+        return env_b
+    if env_b is DEAD:
+        return env_a
+    return {
+        slot: type_
+        for slot, type_ in env_a.items()
+        if env_b.get(slot) is type_
+    }
+
+
+def bin_op_type(op, left: type, right: type):
+    if op in PREDICATES:
+        return bool
+
+    if left is str or right is str:
+        return str
+
+    if op == TT.DIV:
+        return float
+
+    if op == TT.POW:
+        # Negative integer exponents give floats
+        return float if float in (left, right) else None
+
+    if op in ARITHMETIC:
+        return float if float in (left, right) else int
+
+
+def unary_op_type(op, operand: type):
+    if op == "not":
+        return bool
+    if op == TT.MINUS and operand is bool:
+        return int
+    return operand
+
+
+def type_name(type_):
+    if type_ is None:
+        return "unknown"
+    if type_ is List:
+        return "list"
+    return {int: "int", float: "float", bool: "bool", str: "string"}[type_]
+
+
+class TypeInferrer:
+    def __init__(self):
+        self.env: dict = DEAD
+        # Where break and continue leave the innermost loop
+        self.breaks: list = []
+        self.continues: list = []
+        # Name of the function being inferred, None at top level
+        self.function: str = None
+
+        # Verdicts on the operator and index nodes of every function; a loop
+        # is inferred until its types settle, so only the last one counts
+        self.typed: dict = {}
+        self.failed: dict = {}
+
+    def infer_program(self, node):
+        self.infer(node)
+
+        for node, func in self.typed.items():
+            if isinstance(node, BinOpNode):
+                node.__class__ = TypedBinOpNode
+                node.func = func
+            elif isinstance(node, UnaryOpNode):
+                node.__class__ = TypedUnaryOpNode
+                node.func = func
+            else:
+                node.__class__ = TypedIndexNode
+
+    def report(self) -> list[str]:
+        # Operations in functions whose types could not be proven
+        total = len(self.typed) + len(self.failed)
+        lines = [f"Typed {len(self.typed)} of {total} operations in functions"]
+
+        failed = sorted(self.failed.items(), key=lambda item: item[0].pos_start.idx)
+        for node, (function, reason) in failed:
+            pos = node.pos_start
+            lines.append(
+                f"  File {pos.fn}, line {pos.ln + 1}, in {function}: {reason}"
+            )
+        return lines
+
+    def infer(self, node):
+        method_name = f"infer_{type(node).__name__}"
+        method = getattr(self, method_name, self.no_infer_method)
+        return method(node)
+
+    def no_infer_method(self, node):
+        raise Exception(f"No infer_{type(node).__name__}")
+
+    def infer_all(self, nodes):
+        for node in nodes:
+            if node is not None:
+                self.infer(node)
+
+    def settle(self, node, func, reason: str):
+        # Records the verdict on a node, unless it sits in top level code;
+        # func is what evaluates it check-free, or None when types are unproven
+        if self.function is None:
+            return
+
+        if func is None:
+            self.typed.pop(node, None)
+            self.failed[node] = (self.function, reason)
+        else:
+            self.failed.pop(node, None)
+            self.typed[node] = func
+
+    def bind(self, location, type_):
+        if self.env is DEAD or location is None:
+            return
+
+        kind, slot = location
+        if kind == LOCAL and type_ is not None:
+            self.env[slot] = type_
+        elif kind == LOCAL:
+            self.env.pop(slot, None)
+
+    def branch(self, node, env: dict) -> dict:
+        # Infers node starting from env and returns where it leaves off
+        self.env = DEAD if env is DEAD else dict(env)
+        self.infer(node)
+        return self.env
+
+    def loop(self, head_node, body_node):
+        # Infers a loop until the types at its head stop changing
+        entry = self.env
+        head = entry
+
+        while True:
+            outer_jumps = self.breaks, self.continues
+            self.breaks, self.continues = [], []
+
+            self.env = DEAD if head is DEAD else dict(head)
+            if head_node is not None:
+                self.infer(head_node)
+            exit_env = self.env
+
+            end = self.branch(body_node, exit_env)
+            for env in self.continues:
+                end = join(end, env)
+
+            breaks = self.breaks
+            self.breaks, self.continues = outer_jumps
+
+            new_head = join(entry, end)
+            if new_head == head:
+                break
+            head = new_head
+
+        for env in breaks:
+            exit_env = join(exit_env, env)
+        self.env = exit_env
+
+    # NODES
+
+    def infer_NumberNode(self, node: NumberNode):
+        return type(node.tok.value)
+
+    infer_BoolNode = infer_NumberNode
+    infer_StringNode = infer_NumberNode
+
+    def infer_ListNode(self, node: ListNode):
+        self.infer_all(node.element_nodes)
+        return List
+
+    def infer_BlockNode(self, node: BlockNode):
+        self.infer_all(node.statement_nodes)
+
+    def infer_DictNode(self, node: DictNode):
+        for key, value in node.key_value_nodes:
+            self.infer(key)
+            self.infer(value)
+
+    def infer_VarAccessNode(self, node: VarAccessNode):
+        if self.env is DEAD or not node.locations:
+            return None
+
+        kind, slot = node.locations[0]
+        if kind == LOCAL:
+            return self.env.get(slot)
+
+    def infer_VarAssignNode(self, node: VarAssignNode):
+        type_ = self.infer(node.value_node)
+        self.bind(node.location, type_)
+        return type_
+
+    def infer_BinOpNode(self, node: BinOpNode):
+        left = self.infer(node.left_node)
+        right = self.infer(node.right_node)
+
+        if left is List and right is List and node.op == TT.PLUS:
+            return List
+
+        func = BINARY_OPS[node.op].get((left, right))
+        self.settle(
+            node,
+            func,
+            f"'{OP_SYMBOLS.get(node.op, node.op)}' on {type_name(left)} "
+            f"and {type_name(right)}",
+        )
+        return bin_op_type(node.op, left, right) if func else None
+
+    def infer_LogicalOpNode(self, node: LogicalOpNode):
+        left = self.infer(node.left_node)
+
+        # The right operand is skipped when the left one decides the result
+        skipped = self.env
+        self.env = DEAD if skipped is DEAD else dict(skipped)
+        right = self.infer(node.right_node)
+        self.env = join(skipped, self.env)
+
+        return bool if BINARY_OPS[node.op].get((left, right)) else None
+
+    def infer_UnaryOpNode(self, node: UnaryOpNode):
+        operand = self.infer(node.node)
+
+        func = UNARY_OPS[node.op].get(operand)
+        self.settle(
+            node,
+            func,
+            f"'{OP_SYMBOLS.get(node.op, node.op)}' on {type_name(operand)}",
+        )
+        return unary_op_type(node.op, operand) if func else None
+
+    def infer_IfNode(self, node: IfNode):
+        end = DEAD
+
+        for condition, body, _ in node.cases:
+            self.infer(condition)
+            # Later conditions run where this one was false
+            rest = self.env
+            end = join(end, self.branch(body, rest))
+            self.env = rest
+
+        if node.else_case:
+            end = join(end, self.branch(node.else_case[0], self.env))
+        else:
+            end = join(end, self.env)
+
+        self.env = end
+
+    def infer_ForNode(self, node: ForNode):
+        self.infer(node.iter_node)
+
+        # Ranges only ever hold ints; other iterables are not tracked
+        if isinstance(node.iter_node, RangeNode):
+            var_type = int
+        else:
+            var_type = None
+
+        self.bind(node.location, var_type)
+        self.loop(None, node.body_node)
+        self.bind(node.location, None)
+
+    def infer_ComprehensionNode(self, node: ComprehensionNode):
+        self.infer(node.iter_node)
+
+        # The comprehension has a frame of its own, holding only its variable
+        outer = self.env
+        self.env = {}
+        if isinstance(node.iter_node, RangeNode):
+            self.bind(node.location, int)
+
+        self.infer_all([node.condition_node, node.key_node, node.element_node])
+        self.env = outer
+
+        return List if node.key_node is None else None
+
+    def infer_WhileNode(self, node: WhileNode):
+        self.loop(node.condition_node, node.body_node)
+
+    def infer_FuncDefNode(self, node: FuncDefNode):
+        outer = self.env, self.breaks, self.continues, self.function
+
+        # Parameters are bound by the caller, so every slot starts unknown
+        self.env = {}
+        self.breaks, self.continues = [], []
+        self.function = node.var_name_tok.value if node.var_name_tok else "<anonymous>"
+        self.infer(node.body_node)
+
+        self.env, self.breaks, self.continues, self.function = outer
+        self.bind(node.location, None)
+
+    def infer_CallNode(self, node: CallNode):
+        self.infer(node.node_to_call)
+        self.infer_all(node.arg_nodes)
+
+    def infer_IndexNode(self, node: IndexNode):
+        data = self.infer(node.data_node)
+        index = self.infer(node.index_node)
+
+        if data is List and index is int:
+            self.settle(node, True, "")
+        else:
+            self.settle(
+                node,
+                None,
+                f"index into {type_name(data)} with {type_name(index)}",
+            )
+
+    def infer_IndexAssignNode(self, node: IndexAssignNode):
+        self.infer(node.data_node)
+        self.infer(node.index)
+        self.infer(node.value_node)
+
+    def infer_AugAssignNode(self, node: AugAssignNode):
+        target = node.target
+        if isinstance(target, VarAccessNode):
+            current = self.infer(target)
+        else:
+            self.infer(target.data_node)
+            self.infer(target.index_node)
+            current = None
+
+        value = self.infer(node.value_node)
+
+        if current is List and value is List and node.op == TT.PLUS:
+            type_ = List
+        elif BINARY_OPS[node.op].get((current, value)):
+            type_ = bin_op_type(node.op, current, value)
+        else:
+            type_ = None
+
+        if isinstance(target, VarAccessNode):
+            self.bind(node.location, type_)
+        return type_
+
+    def infer_ReturnNode(self, node: ReturnNode):
+        self.infer_all([node.node_to_return])
+        self.env = DEAD
+
+    def infer_YieldNode(self, node: YieldNode):
+        self.infer_all([node.node_to_yield])
+
+    def infer_ContinueNode(self, node: ContinueNode):
+        self.continues.append(self.env)
+        self.env = DEAD
+
+    def infer_BreakNode(self, node: BreakNode):
+        self.breaks.append(self.env)
+        self.env = DEAD
+
+    def infer_DelNode(self, node: DelNode):
+        if isinstance(node.atom, VarAccessNode):
+            if node.atom.locations:
+                self.bind(node.atom.locations[0], None)
+        else:
+            self.infer(node.atom)
+
+    def infer_RangeNode(self, node: RangeNode):
+        self.infer_all(
+            [node.start_value_node, node.end_value_node, node.step_value_node]
+        )
+
+    def infer_IfExprNode(self, node: IfExprNode):
+        self.infer(node.condition_node)
+        entry = self.env
+
+        self.env = DEAD if entry is DEAD else dict(entry)
+        then_type = self.infer(node.then_node)
+        then_env = self.env
+
+        self.env = DEAD if entry is DEAD else dict(entry)
+        else_type = self.infer(node.else_node)
+
+        self.env = join(then_env, self.env)
+        return then_type if then_type is else_type else None
@@ -1,50 +1,158 @@
+import ctypes
 import json
+import operator
 import os
-
-from .utils.utils import TT, Context, RTResult, SymbolTable
-from .utils.ast_json_generator import Generator
+import sys
+import threading
+from array import array
+from itertools import chain, islice, repeat
+
+from .utils.utils import (
+    TT,
+    Cell,
+    Context,
+    Frame,
+    FrozenSymbolTable,
+    RTResult,
+    SymbolTable,
+    str_to_int,
+)
+from .utils.ast_json_generator import Generator as ASTGenerator
 from .utils.errors import RTError, OutOfRangeError
 
 from .datatypes.coretypes import *
 from .datatypes.derivedtypes import *
+from .datatypes.arrays import ARRAY_OPS, INT, Array, typecode_of
+from .datatypes.unboxed import (
+    BINARY_OPS,
+    FAST_OPS,
+    NUMERIC,
+    UNARY_OPS,
+    box,
+    is_true,
+    unbox,
+)
 
 from .parser import *
 from .lexer import Lexer
+from .resolver import CELL, FREE, LOCAL, Resolver
+from .inference import TypeInferrer
+from .profiles import load_profile, save_profile
 
 
 class Function(BaseFunction):
     def __init__(
-        self, name, body_node: BinOpNode, arg_names: list, should_auto_return: bool
+        self,
+        name,
+        body_node: BinOpNode,
+        arg_names: list,
+        should_auto_return: bool,
+        frame_size: int,
+        cell_slots: tuple,
+        cells: tuple,
+        symbol_table: SymbolTable,
+        is_generator: bool = False,
     ):
         super().__init__(name)
         self.body_node = body_node
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
-
-    def execute(self, args):
+        self.frame_size = frame_size
+        self.cell_slots = cell_slots
+        self.cells = cells
+        self.symbol_table = symbol_table
+        self.is_generator = is_generator
+
+    def generate_new_context(self):
+        new_context = Context(self.name, self.context, self.pos_start)
+        new_context.symbol_table = self.symbol_table
+        return new_context
+
+    def execute(self, args, checked: bool = False):
+        # checked is set when the caller already matched args to this function
         res = RTResult()
-        interpreter = Interpreter()
-        exec_context = self.generate_new_context()
+        call_stack = interpreter.call_stack
 
-        res.register(self.check_and_populate_args(self.arg_names, args, exec_context))
-        if res.should_return():
-            return res
+        if len(call_stack) >= interpreter.max_call_depth:
+            return res.faliure(
+                RTError(
+                    self.pos_start,
+                    self.pos_end,
+                    f"Maximum call depth of {interpreter.max_call_depth} exceeded",
+                    self.context,
+                )
+            )
 
-        value = res.register(interpreter.visit(self.body_node, exec_context))
-        if res.should_return() and res.function_return_value is None:
-            return res
+        function = self
+        while True:
+            exec_context = function.generate_new_context()
 
-        return_value = (
-            (value if self.should_auto_return else None)
-            or res.function_return_value
-            or Null()
-        )
+            if not checked:
+                res.register(function.check_args(function.arg_names, args))
+                if res.should_return():
+                    return res
 
-        return res.success(return_value)
+            # Parameters take the first slots of the frame
+            slots = args + [None] * (function.frame_size - len(args))
+            for slot in function.cell_slots:
+                slots[slot] = Cell(slots[slot])
+            exec_context.frame = Frame(slots, function.cells)
+
+            # The body of a generator only runs as the generator is iterated,
+            # long after its caller may have returned
+            if function.is_generator:
+                exec_context.parent = interpreter.program_context
+                steps = interpreter.generate(function.body_node, exec_context)
+                return res.success(
+                    Generator(function.name, steps, exec_context)
+                    .set_context(self.context)
+                    .set_pos(self.pos_start, self.pos_end)
+                )
+
+            call_stack.append(exec_context)
+            try:
+                value = res.register(
+                    interpreter.visit(function.body_node, exec_context)
+                )
+            finally:
+                call_stack.pop()
+
+            if res.should_return() and res.function_return_value is None:
+                return res
+
+            # The caller is only kept for tracebacks while the call runs, so
+            # values escaping the call, closures among them, keep neither the
+            # caller chain nor the frame; closures hold their own cells
+            exec_context.parent = interpreter.program_context
+            exec_context.frame = None
+
+            return_value = (
+                (value if function.should_auto_return else None)
+                or res.function_return_value
+                or Null()
+            )
+
+            if type(return_value) is not TailCall:
+                return res.success(return_value)
+
+            # The tail callee takes over this call, entered from the same site;
+            # its own call site already matched it to the args
+            function = return_value.function
+            checked = True
+            function.set_pos(self.pos_start, self.pos_end).set_context(self.context)
+            args = return_value.args
 
     def copy(self):
         copy = Function(
-            self.name, self.body_node, self.arg_names, self.should_auto_return
+            self.name,
+            self.body_node,
+            self.arg_names,
+            self.should_auto_return,
+            self.frame_size,
+            self.cell_slots,
+            self.cells,
+            self.symbol_table,
+            self.is_generator,
         )
         copy.set_context(self.context)
         copy.set_pos(self.pos_start, self.pos_end)
@@ -54,210 +162,549 @@ class Function(BaseFunction):
         return f"<function {self.name}>"
 
 
+class TailCall:
+    # Returned in place of the result of a call in tail position; the running
+    # Function.execute makes the call itself instead of nesting another one.
+    def __init__(self, function: Function, args: list):
+        self.function = function
+        self.args = args
+
+
+class WhileLoop(LazyIterable):
+    # The values of a while expression, produced by running the loop as they
+    # are iterated rather than collected up front
+    def __init__(self, node: WhileNode, loop_context: Context):
+        super().__init__()
+        self.node = node
+        self.loop_context = loop_context
+
+    def __iter__(self):
+        res = RTResult()
+        node, context = self.node, self.loop_context
+
+        while True:
+            condition = res.register(
+                interpreter.visit_value(node.condition_node, context)
+            )
+            if res.error:
+                yield None, res.error
+                return
+
+            if not is_true(condition):
+                return
+
+            value = res.register(interpreter.visit(node.body_node, context))
+            if res.error:
+                yield None, res.error
+                return
+
+            # A return has nowhere to go once the loop runs lazily, so it
+            # ends the loop like a break
+            if res.loop_should_break or res.function_return_value:
+                return
+
+            if not res.loop_should_continue:
+                yield value, None
+
+    def collect(self):
+        # Runs the loop to the end, where its values are needed all at once
+        elements = []
+        for value, error in self:
+            if error:
+                return None, error
+            elements.append(value)
+
+        values = List(elements).set_context(self.context)
+        return values.set_pos(self.pos_start, self.pos_end), None
+
+    def __repr__(self):
+        return "<while loop>"
+
+
+class Generator(LazyIterable):
+    # What calling a function containing yield returns. Its body runs as the
+    # generator is iterated, up to the next yield each time; steps is the
+    # python generator Interpreter.generate made of the body.
+    def __init__(self, name: str, steps, exec_context: Context):
+        super().__init__()
+        self.name = name
+        self.steps = steps
+        self.exec_context = exec_context
+
+    def __iter__(self):
+        call_stack = interpreter.call_stack
+
+        while True:
+            # Iterating a generator from its own body would re-enter it
+            if self.steps.gi_running:
+                yield None, RTError(
+                    self.pos_start,
+                    self.pos_end,
+                    f"Generator {self.name} is already running",
+                    self.context,
+                )
+                return
+
+            call_stack.append(self.exec_context)
+            try:
+                value = next(self.steps)
+            except StopIteration as stop:
+                # Ends with the result of the body, or None once exhausted
+                if stop.value is not None and stop.value.error:
+                    yield None, stop.value.error
+                return
+            finally:
+                call_stack.pop()
+
+            yield value, None
+
+    def __repr__(self):
+        return f"<generator {self.name}>"
+
+
+class Iterator(LazyIterable):
+    # What the iterator built-ins (zip, enumerate, ...) return; items is a
+    # python iterator of (value, error) pairs that pulls from the iterables
+    # it was made of only as far as it is iterated. It is consumed once, so
+    # a second loop over it carries on where the first one stopped.
+    def __init__(self, name: str, items):
+        super().__init__()
+        self.name = name
+        self.items = items
+
+    def __iter__(self):
+        return self.items
+
+    def __repr__(self):
+        return f"<{self.name} iterator>"
+
+
+def is_iterable(value: DataType) -> bool:
+    return type(value).__iter__ is not DataType.__iter__
+
+
+def zip_items(first: DataType, second: DataType):
+    for (a, error), (b, other_error) in zip(first, second):
+        if error or other_error:
+            yield None, error or other_error
+            return
+        yield List([a, b]), None
+
+
+def enumerate_items(iterable: DataType):
+    for i, (value, error) in enumerate(iterable):
+        if error:
+            yield None, error
+            return
+        yield List([Int(i), value]), None
+
+
+def skip_items(iterable: DataType, count: int):
+    items = iter(iterable)
+
+    # The skipped values are still produced, so their errors are not lost
+    for _, error in islice(items, count):
+        if error:
+            yield None, error
+            return
+
+    yield from items
+
+
 class BuiltInFunction(BaseFunction):
-    def __init__(self, name):
+    def __init__(self, name, func=None):
         super().__init__(name)
 
+        # Built-ins are plain python callables taking the cloudy arguments
+        # positionally and returning (value, error message)
+        self.func = func or getattr(BuiltInFunction, f"execute_{name}")
+        code = self.func.__code__
+        self.arg_names = code.co_varnames[: code.co_argcount]
+
     def execute(self, args):
         res = RTResult()
-        exec_context = self.generate_new_context()
 
-        method_name = f"execute_{self.name}"
-        method = getattr(self, method_name, self.no_visit_method)
-
-        res.register(self.check_and_populate_args(method.arg_names, args, exec_context))
+        res.register(self.check_args(self.arg_names, args))
         if res.should_return():
             return res
 
-        return_value = res.register(method(exec_context))
-        if res.should_return():
-            return res
-        return res.success(return_value)
+        return self.call(args, self.pos_start, self.pos_end, self.context)
+
+    def call(self, args, pos_start, pos_end, context: Context):
+        # Arguments have already been checked against the arity
+        value, error = self.func(*args)
+
+        # Errors of cloudy code the built-in ran are passed on as they are
+        if isinstance(error, RTError):
+            return RTResult().faliure(error)
+
+        if error:
+            # The built-in only gets a context of its own for the traceback
+            exec_context = Context(self.name, context, pos_start)
+            return RTResult().faliure(RTError(pos_start, pos_end, error, exec_context))
+
+        # Lazy values report their errors at the call that made them
+        if isinstance(value, LazyIterable):
+            value.set_pos(pos_start, pos_end).set_context(context)
+
+        return RTResult().success(value)
 
     def copy(self):
         return (
-            BuiltInFunction(self.name)
+            BuiltInFunction(self.name, self.func)
             .set_context(self.context)
             .set_pos(self.pos_start, self.pos_end)
         )
 
-    def no_visit_method(self):
-        raise Exception(f"No execute_{self.name} method defined.")
-
     # BUILT-INS
 
-    def execute_print(self, exec_context):
-        print(str(exec_context.symbol_table.get("value")))
-        return RTResult().success(Null())
+    @staticmethod
+    def execute_print(value):
+        # A lazy loop is printed with its values
+        if type(value) is WhileLoop:
+            value, error = value.collect()
+            if error:
+                return None, error
 
-    execute_print.arg_names = ["value"]
+        print(str(value))
+        return Null(), None
 
-    def execute_print_ret(self, exec_context):
-        return RTResult().success(String(str(exec_context.symbol_table.get("value"))))
+    @staticmethod
+    def execute_print_ret(value):
+        if type(value) is WhileLoop:
+            value, error = value.collect()
+            if error:
+                return None, error
 
-    execute_print_ret.arg_names = ["value"]
+        return String(str(value)), None
 
-    def execute_input(self, exec_context):
+    @staticmethod
+    def execute_input():
         text = input("> ")
-        return RTResult().success(String(text))
-
-    execute_input.arg_names = []
+        return String(text), None
 
-    def execute_input_int(self, exec_context):
+    @staticmethod
+    def execute_input_int():
         while True:
             text = input()
             try:
-                number = int(text)
+                number = str_to_int(text)
                 break
             except ValueError:
                 print(f"'{text}' must be an integer. Try again!")
-        return RTResult().success(NewNum(number))
+        return NewNum(number), None
 
-    execute_input_int.arg_names = []
-
-    def execute_clear(self, exec_context):
+    @staticmethod
+    def execute_clear():
         os.system("cls|clear")
-        return RTResult().success(Null())
+        return Null(), None
 
-    execute_clear.arg_names = []
+    @staticmethod
+    def execute_is_number(value):
+        return Bool(isinstance(value, Number)), None
 
-    def execute_is_number(self, exec_context):
-        return_value = isinstance(exec_context.symbol_table.get("value"), Number)
-        return RTResult().success(Bool(return_value))
+    @staticmethod
+    def execute_is_string(value):
+        return Bool(isinstance(value, String)), None
 
-    execute_is_number.arg_names = ["value"]
+    @staticmethod
+    def execute_is_bool(value):
+        return Bool(isinstance(value, Bool)), None
 
-    def execute_is_string(self, exec_context):
-        return_value = isinstance(exec_context.symbol_table.get("value"), String)
-        return RTResult().success(Bool(return_value))
+    @staticmethod
+    def execute_is_list(value):
+        return Bool(isinstance(value, List)), None
 
-    execute_is_string.arg_names = ["value"]
+    @staticmethod
+    def execute_is_function(value):
+        return Bool(isinstance(value, BaseFunction)), None
 
-    def execute_is_bool(self, exec_context):
-        return_value = isinstance(exec_context.symbol_table.get("value"), Bool)
-        return RTResult().succegss(Bool(return_value))
+    @staticmethod
+    def execute_append(list_, value):
+        if not isinstance(list_, List):
+            return None, "First argument must be a list."
 
-    execute_is_bool.arg_names = ["value"]
+        list_.elements.append(value)
+        return Null(), None
 
-    def execute_is_list(self, exec_context):
-        return_value = isinstance(exec_context.symbol_table.get("value"), List)
-        return RTResult().success(Bool(return_value))
+    @staticmethod
+    def execute_pop(list_, index):
+        if not isinstance(list_, List):
+            return None, "First argument must be a list."
 
-    execute_is_list.arg_names = ["value"]
+        if not isinstance(index, Number):
+            return None, "Second argument must be an integer."
 
-    def execute_is_function(self, exec_context):
-        return_value = isinstance(exec_context.symbol_table.get("value"), BaseFunction)
-        return RTResult().success(Bool(return_value))
+        try:
+            list_.elements.pop(index.value)
+        except:
+            return None, "Index is out of range."
+        return Null(), None
 
-    execute_is_function.arg_names = ["value"]
+    @staticmethod
+    def execute_extend(list1, list2):
+        if not (isinstance(list1, List) and isinstance(list2, (List, Range))):
+            return None, "Both arguments must be lists"
 
-    def execute_append(self, exec_context):
-        list_ = exec_context.symbol_table.get("list")
-        value = exec_context.symbol_table.get("value")
+        if isinstance(list2, Range):
+            list1.elements.extend(map(Int, list2.values))
+        else:
+            list1.elements.extend(list2.elements)
+        return Null(), None
 
-        if not isinstance(list_, List):
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    "First argument must be a list.",
-                    exec_context,
-                )
-            )
+    @staticmethod
+    def execute_len(list_):
+        if isinstance(list_, Range):
+            return NewNum(list_.length), None
 
-        list_.elements.append(value)
-        return RTResult().success(Null())
+        if isinstance(list_, Set):
+            return NewNum(len(list_.elements)), None
+
+        if isinstance(list_, Dict):
+            return NewNum(len(list_.pairs)), None
 
-    execute_append.arg_names = ["list", "value"]
+        if isinstance(list_, DictView):
+            return NewNum(len(list_.dict.pairs)), None
 
-    def execute_pop(self, exec_context):
-        list_ = exec_context.symbol_table.get("list")
-        index = exec_context.symbol_table.get("index")
+        if isinstance(list_, Array):
+            return NewNum(len(list_.values)), None
 
         if not isinstance(list_, List):
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    "First argument must be a list.",
-                    exec_context,
-                )
-            )
+            return None, "Argument must be a list"
 
-        if not isinstance(index, Number):
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    "Second argument must be an integer.",
-                    exec_context,
-                )
-            )
+        return NewNum(len(list_.elements)), None
+
+    @staticmethod
+    def execute_slice(sequence, start, end):
+        # Python slice semantics; slicing a range gives another range
+        if not isinstance(sequence, (String, List, Range)):
+            return None, "First argument must be a string, list or range"
+
+        if not (isinstance(start, Int) and isinstance(end, Int)):
+            return None, "Slice bounds must be integers"
+
+        if isinstance(sequence, Range):
+            return sequence.slice(start.value, end.value), None
+
+        if isinstance(sequence, String):
+            return String(sequence.value[start.value : end.value]), None
+
+        return List(sequence.elements[start.value : end.value]), None
+
+    @staticmethod
+    def execute_list(iterable):
+        # Collects the values of any iterable, running lazy ones to the end
+        elements = []
+
+        for value, error in iterable:
+            if error and isinstance(iterable, LazyIterable):
+                return None, error
+            if error:
+                return None, "Argument must be iterable"
+            elements.append(value)
+
+        return List(elements), None
+
+    @staticmethod
+    def execute_set(iterable):
+        # Collects the distinct values of any iterable, as list does
+        elements = {}
+
+        for value, error in iterable:
+            if error and isinstance(iterable, LazyIterable):
+                return None, error
+            if error:
+                return None, "Argument must be iterable"
+
+            key = value.hash_key()
+            if key is UNHASHABLE:
+                return None, f"Unhashable type '{type(value).__name__.lower()}'"
+            elements.setdefault(key, value)
+
+        return Set(elements), None
+
+    @staticmethod
+    def execute_add(set_, value):
+        if not isinstance(set_, Set):
+            return None, "First argument must be a set."
+
+        key = value.hash_key()
+        if key is UNHASHABLE:
+            return None, f"Unhashable type '{type(value).__name__.lower()}'"
+
+        set_.elements.setdefault(key, value)
+        return Null(), None
+
+    @staticmethod
+    def execute_discard(set_, value):
+        if not isinstance(set_, Set):
+            return None, "First argument must be a set."
+
+        set_.elements.pop(value.hash_key(), None)
+        return Null(), None
+
+    @staticmethod
+    def execute_union(set1, set2):
+        if not (isinstance(set1, Set) and isinstance(set2, Set)):
+            return None, "Both arguments must be sets"
+
+        return set1.union(set2), None
+
+    @staticmethod
+    def execute_intersection(set1, set2):
+        if not (isinstance(set1, Set) and isinstance(set2, Set)):
+            return None, "Both arguments must be sets"
+
+        return set1.intersection(set2), None
+
+    @staticmethod
+    def execute_difference(set1, set2):
+        if not (isinstance(set1, Set) and isinstance(set2, Set)):
+            return None, "Both arguments must be sets"
+
+        return set1.difference(set2), None
+
+    @staticmethod
+    def execute_keys(dict_):
+        if not isinstance(dict_, Dict):
+            return None, "Argument must be a dict"
+
+        return KeysView(dict_), None
+
+    @staticmethod
+    def execute_values(dict_):
+        if not isinstance(dict_, Dict):
+            return None, "Argument must be a dict"
+
+        return ValuesView(dict_), None
+
+    @staticmethod
+    def execute_items(dict_):
+        if not isinstance(dict_, Dict):
+            return None, "Argument must be a dict"
+
+        return ItemsView(dict_), None
+
+    @staticmethod
+    def execute_zip(iterable1, iterable2):
+        if not (is_iterable(iterable1) and is_iterable(iterable2)):
+            return None, "Both arguments must be iterable"
+
+        return Iterator("zip", zip_items(iterable1, iterable2)), None
+
+    @staticmethod
+    def execute_enumerate(iterable):
+        if not is_iterable(iterable):
+            return None, "Argument must be iterable"
+
+        return Iterator("enumerate", enumerate_items(iterable)), None
+
+    @staticmethod
+    def execute_chain(iterable1, iterable2):
+        if not (is_iterable(iterable1) and is_iterable(iterable2)):
+            return None, "Both arguments must be iterable"
+
+        return Iterator("chain", chain(iterable1, iterable2)), None
+
+    @staticmethod
+    def execute_take(iterable, count):
+        if not is_iterable(iterable):
+            return None, "First argument must be iterable"
+
+        if not isinstance(count, Int) or count.value < 0:
+            return None, "Second argument must be a non-negative integer"
+
+        return Iterator("take", islice(iterable, count.value)), None
+
+    @staticmethod
+    def execute_skip(iterable, count):
+        if not is_iterable(iterable):
+            return None, "First argument must be iterable"
+
+        if not isinstance(count, Int) or count.value < 0:
+            return None, "Second argument must be a non-negative integer"
+
+        return Iterator("skip", skip_items(iterable, count.value)), None
+
+    @staticmethod
+    def execute_array(iterable):
+        # Packs the numbers of an iterable; ranges are packed natively
+        if isinstance(iterable, Range):
+            return Array(array(INT, iterable.values)), None
+
+        if isinstance(iterable, Array):
+            return Array(array(iterable.values.typecode, iterable.values)), None
+
+        values = []
+        for value, error in iterable:
+            if error and isinstance(iterable, LazyIterable):
+                return None, error
+            if error:
+                return None, "Argument must be iterable"
+            if not isinstance(value, (Number, Bool)):
+                return None, "Arrays can only hold numbers and bools"
+            values.append(value.value)
 
         try:
-            element = list_.elements.pop(index.value)
-        except:
-            return RTResult().faliure(
-                RTError(self.pos_start, self.pos_end, "Index is out of range.")
-            )
-        return RTResult().success(Null())
+            return Array(array(typecode_of(values), values)), None
+        except OverflowError:
+            return None, "Array values must fit in 64 bits"
 
-    execute_pop.arg_names = ["list", "index"]
+    @staticmethod
+    def execute_sum(array_):
+        if not isinstance(array_, Array):
+            return None, "Argument must be an array"
 
-    def execute_extend(self, exec_context):
-        list1 = exec_context.symbol_table.get("list1")
-        list2 = exec_context.symbol_table.get("list2")
+        return NewNum(sum(array_.values)), None
 
-        if not (isinstance(list1, List) and isinstance(list2, List)):
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    "Both arguments must be lists",
-                    exec_context,
-                )
-            )
+    @staticmethod
+    def execute_min(array_):
+        if not isinstance(array_, Array):
+            return None, "Argument must be an array"
 
-        list1.elements.extend(list2.elements)
-        return RTResult().success(Null())
+        if not array_.values:
+            return None, "Array is empty"
 
-    execute_extend.arg_names = ["list1", "list2"]
+        return array_.box(min(array_.values)), None
 
-    def execute_len(self, exec_context):
-        list_ = exec_context.symbol_table.get("list")
-        if not isinstance(list_, List):
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    "Argument must be a list",
-                    exec_context,
-                )
-            )
+    @staticmethod
+    def execute_max(array_):
+        if not isinstance(array_, Array):
+            return None, "Argument must be an array"
+
+        if not array_.values:
+            return None, "Array is empty"
 
-        return RTResult().success(NewNum(len(list_.elements)))
+        return array_.box(max(array_.values)), None
 
-    execute_len.arg_names = ["list"]
+    @staticmethod
+    def execute_mean(array_):
+        if not isinstance(array_, Array):
+            return None, "Argument must be an array"
 
-    def execute_type(self, exec_context):
-        obj = exec_context.symbol_table.get("obj")
+        if not array_.values:
+            return None, "Array is empty"
 
-        return RTResult().success(String(type(obj).__name__.lower()))
+        return Float(sum(array_.values) / len(array_.values)), None
 
-    execute_type.arg_names = ["obj"]
+    @staticmethod
+    def execute_dot(array1, array2):
+        if not (isinstance(array1, Array) and isinstance(array2, Array)):
+            return None, "Both arguments must be arrays"
 
-    def execute_run(self, exec_context):
-        fn = exec_context.symbol_table.get("fn")
+        if len(array1.values) != len(array2.values):
+            return None, "Arrays must have the same length"
 
+        return NewNum(sum(map(operator.mul, array1.values, array2.values))), None
+
+    @staticmethod
+    def execute_type(obj):
+        return String(type(obj).__name__.lower()), None
+
+    @staticmethod
+    def execute_run(fn):
         if not isinstance(fn, String):
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    "Argument must be string",
-                    exec_context,
-                )
-            )
+            return None, "Argument must be string"
 
         fn = fn.value
 
@@ -266,33 +713,48 @@ class BuiltInFunction(BaseFunction):
                 script = f.read()
 
         except Exception as e:
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    f'Failed to load scirpt "{fn}"\n{e}',
-                    exec_context,
-                )
-            )
+            return None, f'Failed to load scirpt "{fn}"\n{e}'
 
         _, error = run(fn, script)
 
         if error:
-            return RTResult().faliure(
-                RTError(
-                    self.pos_start,
-                    self.pos_end,
-                    f'Failed to finish executing script "{fn}".\n{error}',
-                    exec_context,
-                )
-            )
+            return None, f'Failed to finish executing script "{fn}".\n{error}'
 
-        return RTResult().success(Null())
+        return Null(), None
 
-    execute_run.arg_names = ["fn"]
+
+# Guard failures after which an operator node is left generic
+MAX_DEOPTS = 4
+
+CONSTANT_NODES = (NumberNode, StringNode, BoolNode)
+MISSING = object()
 
 
 class Interpreter:
+    # Evaluate primitive expressions on raw python values instead of wrappers
+    unboxed = True
+    # Specialize operator nodes to the operand types they see (see QUICKENING)
+    quicken = True
+    # Drop type checks where type inference proves the types (see inference.py)
+    infer_types = True
+    # Keep type feedback of scripts between runs (see profiles.py); off unless
+    # asked for, as it writes a file next to the script
+    persist_profiles = False
+    # Where to write the parsed program as JSON, for debugging the parser
+    ast_dump_path = None
+    # Run calls in tail position without growing the call stack
+    tail_calls = True
+    # Produce the values of while expressions as they are iterated
+    lazy_loops = False
+    # Deepest nesting of cloudy calls before a runtime error
+    max_call_depth = 10000
+
+    def __init__(self):
+        # Contexts of the cloudy calls currently running, innermost last
+        self.call_stack = []
+        # Finished calls and generators are parented on the program's context
+        self.program_context = None
+
     def visit(self, node, context: Context) -> RTResult:
         method_name = f"visit_{type(node).__name__}"
         method = getattr(self, method_name, self.no_visit_method)
@@ -327,7 +789,17 @@ class Interpreter:
         data = res.register(self.visit(node.data_node, context))
         if res.should_return():
             return res
-        if not isinstance(data, (String, List, Dict)):
+
+        index: Number = res.register(self.visit(node.index_node, context))
+        if res.should_return():
+            return res
+
+        return self.get_item(node, data, index, context)
+
+    def get_item(self, node: IndexNode, data: DataType, index, context: Context):
+        res = RTResult()
+
+        if not isinstance(data, (String, List, Range, Array, Dict)):
             return res.faliure(
                 RTError(
                     node.pos_start,
@@ -336,11 +808,13 @@ class Interpreter:
                 )
             )
 
-        index: Number = res.register(self.visit(node.index_node, context))
-        if res.should_return():
-            return res
+        if isinstance(data, Array) and isinstance(index, Array):
+            result, error = data.select(index)
+            if error:
+                return res.faliure(self.locate_error(error, node.index_node, context))
+            return res.success(result)
 
-        if isinstance(data, (String, List)):
+        if isinstance(data, (String, List, Range, Array)):
             if not isinstance(index, Int):
                 return res.faliure(
                     RTError(
@@ -364,46 +838,78 @@ class Interpreter:
             return res.success(return_value)
 
         elif isinstance(data, Dict):
-            if not isinstance(index, String):
-                return res.faliure(
-                    RTError(
-                        node.index_node.pos_start,
-                        node.index_node.pos_end,
-                        f"Key '{index.value}' not found",
-                        context,
-                    )
-                )
+            key = res.register(self.hash_key(index, node.index_node, context))
+            if res.should_return():
+                return res
 
-            return_value = data.pairs.get(index.value)
+            return_value = data.pairs.get(key)
 
-            if not return_value:
+            if return_value is None:
                 return res.faliure(
                     RTError(
                         node.index_node.pos_start,
                         node.index_node.pos_end,
-                        f"Key '{index.value}' not found",
+                        f"Key {index!r} not found",
                         context,
                     )
                 )
 
             return res.success(return_value)
 
-    def visit_IndexAssignNode(self, node: IndexAssignNode, context: Context):
+    def hash_key(self, value: DataType, node, context: Context):
+        # The key value is stored under in dicts and sets
         res = RTResult()
-        var_name = node.var_name_tok.value
-        var = context.symbol_table.get(var_name)
+        key = value.hash_key()
 
-        if not var:
+        if key is UNHASHABLE:
             return res.faliure(
                 RTError(
-                    node.var_name_tok.pos_start,
-                    node.var_name_tok.pos_end,
-                    f"Undefined '{var_name}'",
+                    node.pos_start,
+                    node.pos_end,
+                    f"Unhashable type '{type(value).__name__.lower()}'",
                     context,
                 )
             )
 
-        if not isinstance(var, (List, Dict)):
+        return res.success(key)
+
+    def visit_IndexAssignNode(self, node: IndexAssignNode, context: Context):
+        res = RTResult()
+        data_node = node.data_node
+
+        # The container is assigned into in place; a nested target is
+        # evaluated once, down to its innermost container
+        if type(data_node) is VarAccessNode:
+            var = self.lookup(data_node, context)
+
+            if var is None:
+                return res.faliure(
+                    RTError(
+                        data_node.pos_start,
+                        data_node.pos_end,
+                        f"Undefined '{data_node.var_name_tok.value}'",
+                        context,
+                    )
+                )
+        else:
+            var = res.register(self.visit(data_node, context))
+            if res.should_return():
+                return res
+
+        index = res.register(self.visit(node.index, context))
+        if res.should_return():
+            return res
+
+        value = res.register(self.visit(node.value_node, context))
+        if res.should_return():
+            return res
+
+        return self.set_item(node, var, index, value, node.index, context)
+
+    def set_item(self, node, var: DataType, index, value, index_node, context: Context):
+        res = RTResult()
+
+        if not isinstance(var, (List, Array, Dict)):
             return res.faliure(
                 RTError(
                     node.pos_start,
@@ -413,69 +919,109 @@ class Interpreter:
                 )
             )
 
-        index = res.register(self.visit(node.index, context))
-        if res.should_return():
-            return res
-
-        if isinstance(var, List):
+        if isinstance(var, (List, Array)):
             if not isinstance(index, Int):
                 return res.faliure(
                     RTError(
-                        node.index.pos_start,
-                        node.index.pos_end,
+                        index_node.pos_start,
+                        index_node.pos_end,
                         "Index can only be of type 'int'",
                         context,
                     )
                 )
 
-            elements = var.elements
-
-            if index.value >= len(elements):
+            if not var.is_index(index):
                 return res.faliure(
                     OutOfRangeError(
-                        node.index.pos_start, node.index.pos_end, type(var).__name__
+                        index_node.pos_start, index_node.pos_end, type(var).__name__
                     )
                 )
 
-            value = res.register(self.visit(node.value_node, context))
-            if res.should_return():
-                return res
-
-            elements[index.value] = value
-            context.symbol_table.set(
-                var_name,
-                List(elements)
-                .set_context(var.context)
-                .set_pos(var.pos_start, var.pos_end),
-            )
+            if isinstance(var, Array):
+                error = var.store(index, value)
+                if error:
+                    return res.faliure(
+                        RTError(node.pos_start, node.pos_end, error, context)
+                    )
+                return res.success(value)
 
+            var.elements[index.value] = value
             return res.success(value)
 
         elif isinstance(var, Dict):
-            if not isinstance(index, String):
-                return res.faliure(
-                    RTError(
-                        node.index.pos_start,
-                        node.index.pos_end,
-                        "Dict keys can only be of type 'string'",
-                        context,
-                    )
-                )
+            key = res.register(self.hash_key(index, index_node, context))
+            if res.should_return():
+                return res
 
-            pairs = var.pairs
+            var.pairs[key] = value
+            return res.success(value)
 
-            pairs[index.value] = value = res.register(
-                self.visit(node.value_node, context)
-            )
+    def visit_AugAssignNode(self, node: AugAssignNode, context: Context):
+        res = RTResult()
+        target = node.target
+
+        # The target is resolved once: a variable is read and written through
+        # its location, an index target evaluates its container and index once
+        if type(target) is VarAccessNode:
+            current = self.lookup(target, context)
+            if current is None:
+                return self.visit_VarAccessNode(target, context)
+        else:
+            data = res.register(self.visit(target.data_node, context))
+            if res.should_return():
+                return res
+            index = res.register(self.visit(target.index_node, context))
+            if res.should_return():
+                return res
+            current = res.register(self.get_item(target, data, index, context))
             if res.should_return():
                 return res
 
-            context.symbol_table.set(
-                var_name,
-                Dict(pairs).set_context(context).set_pos(var.pos_start, var.pos_end),
-            )
+        value = self.read_operand(node.value_node, context)
+        if value is MISSING:
+            value = res.register(self.visit_value(node.value_node, context))
+            if res.should_return():
+                return res
 
-            return res.success(value)
+        # Lists are extended in place, leaving nothing to store back
+        if node.op == TT.PLUS and type(current) is List and type(value) is List:
+            current.elements.extend(value.elements)
+            return res.success(current)
+
+        result, error = self.apply_aug_op(node, current, value, context)
+        if error:
+            return res.faliure(error)
+
+        if type(target) is VarAccessNode:
+            self.store(target.var_name_tok.value, node.location, result, context)
+            return res.success(result)
+
+        return self.set_item(node, data, index, result, target.index_node, context)
+
+    def apply_aug_op(self, node: AugAssignNode, current, value, context: Context):
+        # Numbers and strings are combined as raw values and boxed once
+        left, right = unbox(current), unbox(value)
+
+        left_type = type(left)
+        right_type = type(right)
+        if left_type is right_type and left_type in FAST_OPS:
+            func = FAST_OPS[left_type].get(node.op)
+        else:
+            func = BINARY_OPS[node.op].get((left_type, right_type))
+
+        if func is not None:
+            result = self.apply_raw_op(func, left, right)
+            if result is not NotImplemented:
+                return box(result), None
+
+        result, error = self.apply_bin_op(
+            node.op,
+            self.box_operand(left, node.target, context),
+            self.box_operand(right, node.value_node, context),
+        )
+        if error:
+            return None, self.locate_error(error, node.value_node, context)
+        return result, None
 
     def visit_DelNode(self, node: DelNode, context: Context):  # sourcery no-metrics
         res = RTResult()
@@ -494,7 +1040,16 @@ class Interpreter:
         if isinstance(atom, VarAccessNode):
             var_name = atom.var_name_tok.value
 
-            if not context.symbol_table.get(var_name):
+            # Only names bound in the current scope can be deleted
+            location = atom.locations[0] if atom.locations else None
+            if context.frame is None:
+                found = var_name in context.symbol_table.symbols
+            elif location is None or location[0] == FREE:
+                found = False
+            else:
+                found = self.load(location, context.frame) is not None
+
+            if not found:
                 return res.faliure(
                     RTError(
                         atom.var_name_tok.pos_start,
@@ -504,7 +1059,10 @@ class Interpreter:
                     )
                 )
 
-            del context.symbol_table.symbols[var_name]
+            if context.frame is None:
+                context.symbol_table.remove(var_name)
+            else:
+                self.store(var_name, location, None, context)
 
             return res.success(Null())
 
@@ -521,7 +1079,7 @@ class Interpreter:
 
             var_name = atom.data_node.var_name_tok.value
 
-            if not context.symbol_table.get(var_name):
+            if self.lookup(atom.data_node, context) is None:
                 return res.faliure(
                     RTError(
                         atom.data_node.var_name_tok.pos_start,
@@ -551,9 +1109,7 @@ class Interpreter:
                         )
                     )
 
-                elements = data_node_val.elements
-
-                if index.value >= len(elements):
+                if not data_node_val.is_index(index):
                     return res.faliure(
                         OutOfRangeError(
                             atom.index_node.pos_start,
@@ -562,49 +1118,27 @@ class Interpreter:
                         )
                     )
 
-                del elements[index.value]
-
-                context.symbol_table.set(
-                    var_name,
-                    List(elements)
-                    .set_context(context)
-                    .set_pos(data_node_val.pos_start, data_node_val.pos_end),
-                )
-
+                del data_node_val.elements[index.value]
                 return res.success(Null())
 
             elif isinstance(data_node_val, Dict):
-                if not isinstance(index, String):
-                    return res.faliure(
-                        RTError(
-                            atom.index_node.pos_start,
-                            atom.index_node.pos_end,
-                            "Dict keys can only be of type 'string'",
-                            context,
-                        )
-                    )
+                key = res.register(self.hash_key(index, atom.index_node, context))
+                if res.should_return():
+                    return res
 
                 pairs = data_node_val.pairs
 
-                if not pairs.get(index.value):
+                if key not in pairs:
                     return res.faliure(
                         RTError(
                             atom.index_node.pos_start,
                             atom.index_node.pos_end,
-                            f"Key '{index.value}' not found",
+                            f"Key {index!r} not found",
                             context,
                         )
                     )
 
-                del pairs[index.value]
-
-                context.symbol_table.set(
-                    var_name,
-                    Dict(pairs)
-                    .set_context(context)
-                    .set_pos(data_node_val.pos_start, data_node_val.pos_end),
-                )
-
+                del pairs[key]
                 return res.success(Null())
 
             else:
@@ -629,6 +1163,19 @@ class Interpreter:
             List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
 
+    def visit_BlockNode(self, node: BlockNode, context: Context):
+        # Statements are run for their effects; only the last value is kept,
+        # for the callers that use a block's value
+        res = RTResult()
+        value = None
+
+        for statement_node in node.statement_nodes:
+            value = res.register(self.visit(statement_node, context))
+            if res.should_return():
+                return res
+
+        return res.success(Null() if value is None else value)
+
     def visit_DictNode(self, node: DictNode, context: Context):
         res = RTResult()
         dict_ = {}
@@ -638,31 +1185,78 @@ class Interpreter:
             if res.should_return():
                 return res
 
-            if not isinstance(key_val, String):
-                return res.faliure(
-                    RTError(
-                        key.pos_start,
-                        key.pos_end,
-                        f"Dictionary keys must be of type 'string' not '{type(key).__name__}'",
-                    )
-                )
+            hash_key = res.register(self.hash_key(key_val, key, context))
+            if res.should_return():
+                return res
 
             value_val = res.register(self.visit(value, context))
             if res.should_return():
                 return res
 
-            dict_[key_val.value] = value_val
+            dict_[hash_key] = value_val
 
         return res.success(
             Dict(dict_).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
 
+    def load(self, location: tuple, frame: Frame):
+        kind, index = location
+        if kind == LOCAL:
+            return frame.slots[index]
+        if kind == CELL:
+            return frame.slots[index].value
+        return frame.cells[index].value
+
+    def lookup(self, node: VarAccessNode, context: Context):
+        for location in node.locations:
+            value = self.load(location, context.frame)
+            if value is not None:
+                return value
+
+        return self.lookup_global(node, context.symbol_table)
+
+    def lookup_global(self, node: VarAccessNode, table: SymbolTable):
+        # Each access site caches its last result alongside the version of
+        # the table it was read from
+        if node.cache is not None:
+            cached_table, version, in_parent, value = node.cache
+            if cached_table is table and version == (
+                table.names_version if in_parent else table.version
+            ):
+                return value
+
+        var_name = node.var_name_tok.value
+        value = table.symbols.get(var_name)
+
+        if value is not None:
+            node.cache = (table, table.version, False, value)
+            return value
+
+        if table.parent is None:
+            return None
+
+        value = table.parent.get(var_name)
+        if value is not None and isinstance(table.parent, FrozenSymbolTable):
+            node.cache = (table, table.names_version, True, value)
+        return value
+
+    def store(self, var_name: str, location: tuple, value, context: Context):
+        if location is None:
+            context.symbol_table.set(var_name, value)
+            return
+
+        kind, index = location
+        if kind == CELL:
+            context.frame.slots[index].value = value
+        else:
+            context.frame.slots[index] = value
+
     def visit_VarAccessNode(self, node: VarAccessNode, context: Context):
         res = RTResult()
         var_name = node.var_name_tok.value
-        value = context.symbol_table.get(var_name)
+        value = self.lookup(node, context)
 
-        if not value:
+        if value is None:
             return res.faliure(
                 RTError(
                     node.pos_start,
@@ -682,102 +1276,457 @@ class Interpreter:
         if res.should_return():
             return res
 
-        context.symbol_table.set(var_name, value)
+        self.store(var_name, node.location, value, context)
         return res.success(value)
 
     def visit_BinOpNode(
         self, node: BinOpNode, context: Context
     ) -> Number:  # sourcery no-metrics
         res = RTResult()
+
+        if self.unboxed:
+            value = res.register(self.visit_unboxed(node, context))
+            if res.should_return():
+                return res
+            return res.success(
+                box(value).set_context(context).set_pos(node.pos_start, node.pos_end)
+            )
+
+        left = res.register(self.visit(node.left_node, context))
+        if res.should_return():
+            return res
+        right = res.register(self.visit(node.right_node, context))
+        if res.should_return():
+            return res
+
+        # Int op Int and Float op Float
+        if type(left) is type(right) and type(left) in (Int, Float):
+            func = FAST_OPS[type(left.value)].get(node.op)
+            if func is not None:
+                result = self.apply_raw_op(func, left.value, right.value)
+                if result is not NotImplemented:
+                    return res.success(
+                        box(result).set_pos(node.pos_start, node.pos_end)
+                    )
+
+        result, error = self.apply_bin_op(node.op, left, right)
+        if error:
+            return res.faliure(self.locate_error(error, node.right_node, context))
+
+        return res.success(result.set_pos(node.pos_start, node.pos_end))
+
+    def visit_LogicalOpNode(self, node: LogicalOpNode, context: Context):
+        res = RTResult()
+
+        if self.unboxed:
+            value = res.register(self.visit_unboxed(node, context))
+            if res.should_return():
+                return res
+            return res.success(
+                box(value).set_context(context).set_pos(node.pos_start, node.pos_end)
+            )
+
         left = res.register(self.visit(node.left_node, context))
         if res.should_return():
             return res
+
+        if isinstance(left, (Number, Bool)):
+            decided = self.decide_logical_op(node, left.value)
+            if decided is not None:
+                return res.success(Bool(decided).set_pos(node.pos_start, node.pos_end))
+
         right = res.register(self.visit(node.right_node, context))
         if res.should_return():
             return res
 
-        if node.op_tok.type == TT.PLUS:
-            result, error = left.add(right)
+        result, error = self.apply_bin_op(node.op, left, right)
+        if error:
+            return res.faliure(self.locate_error(error, node.right_node, context))
+
+        return res.success(result.set_pos(node.pos_start, node.pos_end))
+
+    def decide_logical_op(self, node: LogicalOpNode, left):
+        # The result when the left operand alone settles it, otherwise None
+        if node.op == "and" and not left:
+            return False
+        if node.op == "or" and left:
+            return True
+        return None
+
+    def apply_bin_op(self, op, left: DataType, right: DataType):
+        # A scalar on the left of an array is broadcast as on the right
+        if type(right) is Array and type(left) is not Array and op in ARRAY_OPS:
+            return right.bin_op(op, left, reflected=True)
+
+        if op == TT.PLUS:
+            return left.add(right)
+
+        elif op == TT.MINUS:
+            return left.sub(right)
+
+        elif op == TT.MULT:
+            return left.mul(right)
+
+        elif op == TT.DIV:
+            return left.truedive(right)
+
+        elif op == TT.FDIV:
+            return left.floordiv(right)
+
+        elif op == TT.MODU:
+            return left.mod(right)
+
+        elif op == TT.POW:
+            return left.pow(right)
+
+        elif op == TT.EE:
+            return left.eq(right)
+
+        elif op == TT.NE:
+            return left.ne(right)
+
+        elif op == TT.LT:
+            return left.lt(right)
+
+        elif op == TT.GT:
+            return left.gt(right)
+
+        elif op == TT.LTE:
+            return left.lte(right)
+
+        elif op == TT.GTE:
+            return left.gte(right)
+
+        elif op == TT.IN:
+            return right.in_(left)
+
+        elif op == TT.NOT_IN:
+            return right.not_in(left)
+
+        elif op == "and":
+            return left.and_(right)
+
+        elif op == "or":
+            return left.or_(right)
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode, context: Context):
+        res = RTResult()
+
+        if self.unboxed:
+            value = res.register(self.visit_unboxed(node, context))
+            if res.should_return():
+                return res
+            return res.success(
+                box(value).set_context(context).set_pos(node.pos_start, node.pos_end)
+            )
+
+        number = res.register(self.visit(node.node, context))
+        if res.should_return():
+            return res
+
+        number, error = self.apply_unary_op(node.op_tok, number)
+        if error:
+            return res.faliure(self.locate_error(error, node.node, context))
+        return res.success(number.set_pos(node.pos_start, node.pos_end))
+
+    def apply_unary_op(self, op_tok: Token, number: DataType):
+        if op_tok.type == TT.MINUS:
+            return number.neg()
+        elif op_tok.matches(TT.KEYWORD, "not"):
+            return number.not_()
+        return number, None
+
+    def locate_error(self, error: RTError, node, context: Context) -> RTError:
+        # Primitive values are shared and positionless, so errors raised by
+        # their operations are placed on the offending operand's node
+        if error.pos_start is None:
+            error.pos_start = node.pos_start
+        if error.pos_end is None:
+            error.pos_end = node.pos_end
+        if error.context is None:
+            error.context = context
+        return error
+
+    # UNBOXED EVALUATION
+    # Expressions are evaluated on raw python values (see datatypes/unboxed.py)
+    # and only boxed once their value leaves the expression.
+
+    def visit_value(self, node, context: Context) -> RTResult:
+        if self.unboxed:
+            return self.visit_unboxed(node, context)
+        return self.visit(node, context)
+
+    def visit_unboxed(self, node, context: Context) -> RTResult:
+        method = getattr(self, f"unboxed_{type(node).__name__}", None)
+        if method is not None:
+            return method(node, context)
+
+        res = self.visit(node, context)
+        res.value = unbox(res.value)
+        return res
+
+    def apply_raw_op(self, func, left, right):
+        # Errors such as overflow are reported by the boxed operation
+        try:
+            return func(left, right)
+        except (OverflowError, ZeroDivisionError):
+            return NotImplemented
+
+    def box_operand(self, value, node, context: Context) -> DataType:
+        if isinstance(value, DataType):
+            value = value.copy()
+        else:
+            value = box(value)
+        return value.set_context(context).set_pos(node.pos_start, node.pos_end)
+
+    def unboxed_NumberNode(self, node: NumberNode, context: Context):
+        return RTResult().success(node.tok.value)
+
+    unboxed_BoolNode = unboxed_NumberNode
+    unboxed_StringNode = unboxed_NumberNode
+
+    def unboxed_VarAccessNode(self, node: VarAccessNode, context: Context):
+        value = self.lookup(node, context)
+
+        if value is None:
+            return self.visit_VarAccessNode(node, context)
+
+        return RTResult().success(unbox(value))
+
+    def unboxed_BinOpNode(self, node: BinOpNode, context: Context):
+        res = RTResult()
+        left = res.register(self.visit_unboxed(node.left_node, context))
+        if res.should_return():
+            return res
+        right = res.register(self.visit_unboxed(node.right_node, context))
+        if res.should_return():
+            return res
+
+        return self.apply_unboxed_bin_op(node, left, right, context)
+
+    def unboxed_LogicalOpNode(self, node: LogicalOpNode, context: Context):
+        res = RTResult()
+        left = res.register(self.visit_unboxed(node.left_node, context))
+        if res.should_return():
+            return res
+
+        if type(left) in NUMERIC:
+            decided = self.decide_logical_op(node, left)
+            if decided is not None:
+                return res.success(decided)
+
+        right = res.register(self.visit_unboxed(node.right_node, context))
+        if res.should_return():
+            return res
+
+        return self.apply_unboxed_bin_op(node, left, right, context)
+
+    def apply_unboxed_bin_op(self, node: BinOpNode, left, right, context: Context):
+        res = RTResult()
+
+        left_type = type(left)
+        right_type = type(right)
+        if left_type is right_type and left_type in FAST_OPS:
+            func = FAST_OPS[left_type].get(node.op)
+        else:
+            func = BINARY_OPS[node.op].get((left_type, right_type))
+
+        if func is not None:
+            result = self.apply_raw_op(func, left, right)
+            if result is not NotImplemented:
+                generic = type(node) is BinOpNode
+                if self.quicken and generic and node.deopts < MAX_DEOPTS:
+                    node.__class__ = QuickBinOpNode
+                    node.func = func
+                    node.left_type = left_type
+                    node.right_type = right_type
+                return res.success(result)
+
+        result, error = self.apply_bin_op(
+            node.op,
+            self.box_operand(left, node.left_node, context),
+            self.box_operand(right, node.right_node, context),
+        )
+        if error:
+            return res.faliure(self.locate_error(error, node.right_node, context))
+        return res.success(result)
+
+    def unboxed_UnaryOpNode(self, node: UnaryOpNode, context: Context):
+        res = RTResult()
+        value = res.register(self.visit_unboxed(node.node, context))
+        if res.should_return():
+            return res
+
+        return self.apply_unboxed_unary_op(node, value, context)
+
+    def apply_unboxed_unary_op(self, node: UnaryOpNode, value, context: Context):
+        res = RTResult()
+
+        value_type = type(value)
+        func = UNARY_OPS[node.op].get(value_type)
+
+        if func is not None:
+            generic = type(node) is UnaryOpNode
+            if self.quicken and generic and node.deopts < MAX_DEOPTS:
+                node.__class__ = QuickUnaryOpNode
+                node.func = func
+                node.operand_type = value_type
+            return res.success(func(value))
+
+        result, error = self.apply_unary_op(
+            node.op_tok, self.box_operand(value, node.node, context)
+        )
+        if error:
+            return res.faliure(self.locate_error(error, node.node, context))
+        return res.success(result)
+
+    # QUICKENING
+    # Operator nodes that evaluate on the raw value tables rewrite themselves
+    # into a Quick* variant fixed to the operand types they saw. Those only
+    # check the types before calling the operation, and turn back into the
+    # generic node when the check fails; nodes that keep failing stay generic.
+
+    def read_operand(self, node, context: Context):
+        # Constants and variables are read without going through an RTResult;
+        # anything else, including an undefined name, gives MISSING
+        node_type = type(node)
+        if node_type is VarAccessNode:
+            value = self.lookup(node, context)
+            return MISSING if value is None else unbox(value)
+        if node_type in CONSTANT_NODES:
+            return node.tok.value
+        return MISSING
+
+    def unboxed_QuickBinOpNode(self, node: QuickBinOpNode, context: Context):
+        res = RTResult()
+
+        left = self.read_operand(node.left_node, context)
+        if left is MISSING:
+            left = res.register(self.visit_unboxed(node.left_node, context))
+            if res.should_return():
+                return res
+
+        right = self.read_operand(node.right_node, context)
+        if right is MISSING:
+            right = res.register(self.visit_unboxed(node.right_node, context))
+            if res.should_return():
+                return res
 
-        elif node.op_tok.type == TT.MINUS:
-            result, error = left.sub(right)
+        if type(left) is node.left_type and type(right) is node.right_type:
+            try:
+                result = node.func(left, right)
+            except OverflowError:
+                result = NotImplemented
 
-        elif node.op_tok.type == TT.MULT:
-            result, error = left.mul(right)
+            if result is not NotImplemented:
+                return res.success(result)
+        else:
+            node.__class__ = BinOpNode
+            node.deopts += 1
 
-        elif node.op_tok.type == TT.DIV:
-            result, error = left.truedive(right)
+        # Operations the tables leave to the boxed types, such as division
+        # by zero, go through the generic path without deoptimizing
+        return self.apply_unboxed_bin_op(node, left, right, context)
 
-        elif node.op_tok.type == TT.FDIV:
-            result, error = left.floordiv(right)
+    def unboxed_QuickUnaryOpNode(self, node: QuickUnaryOpNode, context: Context):
+        res = RTResult()
 
-        elif node.op_tok.type == TT.MODU:
-            result, error = left.mod(right)
+        value = self.read_operand(node.node, context)
+        if value is MISSING:
+            value = res.register(self.visit_unboxed(node.node, context))
+            if res.should_return():
+                return res
 
-        elif node.op_tok.type == TT.POW:
-            result, error = left.pow(right)
+        if type(value) is node.operand_type:
+            return res.success(node.func(value))
 
-        elif node.op_tok.type == TT.EE:
-            result, error = left.eq(right)
+        node.__class__ = UnaryOpNode
+        node.deopts += 1
+        return self.apply_unboxed_unary_op(node, value, context)
 
-        elif node.op_tok.type == TT.NE:
-            result, error = left.ne(right)
+    visit_QuickBinOpNode = visit_BinOpNode
+    visit_QuickUnaryOpNode = visit_UnaryOpNode
 
-        elif node.op_tok.type == TT.LT:
-            result, error = left.lt(right)
+    # TYPED NODES
+    # Nodes whose operand types were proven by type inference (see
+    # inference.py) skip the type checks altogether.
 
-        elif node.op_tok.type == TT.GT:
-            result, error = left.gt(right)
+    def unboxed_TypedBinOpNode(self, node: TypedBinOpNode, context: Context):
+        res = RTResult()
 
-        elif node.op_tok.type == TT.LTE:
-            result, error = left.lte(right)
+        left = self.read_operand(node.left_node, context)
+        if left is MISSING:
+            left = res.register(self.visit_unboxed(node.left_node, context))
+            if res.should_return():
+                return res
 
-        elif node.op_tok.type == TT.GTE:
-            result, error = left.gte(right)
+        right = self.read_operand(node.right_node, context)
+        if right is MISSING:
+            right = res.register(self.visit_unboxed(node.right_node, context))
+            if res.should_return():
+                return res
 
-        elif node.op_tok.type == TT.IN:
-            result, error = right.in_(left)
+        try:
+            result = node.func(left, right)
+        except OverflowError:
+            result = NotImplemented
 
-        elif node.op_tok.type == TT.NOT_IN:
-            result, error = right.not_in(left)
+        if result is not NotImplemented:
+            return res.success(result)
 
-        elif node.op_tok.matches(TT.KEYWORD, "and"):
-            result, error = left.and_(right)
+        # Division by zero and the like are reported by the boxed types
+        return self.apply_unboxed_bin_op(node, left, right, context)
 
-        elif node.op_tok.matches(TT.KEYWORD, "or"):
-            result, error = left.or_(right)
+    def unboxed_TypedUnaryOpNode(self, node: TypedUnaryOpNode, context: Context):
+        res = RTResult()
 
-        if error:
-            return res.faliure(error)
+        value = self.read_operand(node.node, context)
+        if value is MISSING:
+            value = res.register(self.visit_unboxed(node.node, context))
+            if res.should_return():
+                return res
 
-        return res.success(result.set_pos(node.pos_start, node.pos_end))
+        return res.success(node.func(value))
 
-    def visit_UnaryOpNode(self, node: UnaryOpNode, context: Context):
+    def visit_TypedIndexNode(self, node: TypedIndexNode, context: Context):
         res = RTResult()
-        number = res.register(self.visit(node.node, context))
-        if res.should_return():
-            return res
 
-        error = None
+        data = self.read_operand(node.data_node, context)
+        if data is MISSING:
+            data = res.register(self.visit(node.data_node, context))
+            if res.should_return():
+                return res
 
-        if node.op_tok.type == TT.MINUS:
-            number = -number
-        elif node.op_tok.matches(TT.KEYWORD, "not"):
-            number, error = number.not_()
+        index = self.read_operand(node.index_node, context)
+        if index is MISSING:
+            index = res.register(self.visit_unboxed(node.index_node, context))
+            if res.should_return():
+                return res
 
-        if error:
-            return res
-        return res.success(number.set_pos(node.pos_start, node.pos_end))
+        elements = data.elements
+        if not -len(elements) <= index < len(elements):
+            return res.faliure(
+                OutOfRangeError(
+                    node.index_node.pos_start,
+                    node.index_node.pos_end,
+                    type(data).__name__,
+                )
+            )
+
+        return res.success(elements[index])
+
+    visit_TypedBinOpNode = visit_BinOpNode
+    visit_TypedUnaryOpNode = visit_UnaryOpNode
 
     def visit_IfNode(self, node: IfNode, context=None):
         res = RTResult()
 
         for condition, expr, should_return_null in node.cases:
-            condition_value = res.register(self.visit(condition, context))
+            condition_value = res.register(self.visit_value(condition, context))
             if res.should_return():
                 return res
 
-            if condition_value.is_true():
+            if is_true(condition_value):
                 expr_value = res.register(self.visit(expr, context))
                 if res.should_return():
                     return res
@@ -799,18 +1748,14 @@ class Interpreter:
         if res.should_return():
             return res
 
+        if type(iterable) is Range:
+            return self.count_range(node, iterable, context)
+
         for obj, error in iterable:
             if error:
-                return res.faliure(
-                    RTError(
-                        node.iter_node.pos_start,
-                        node.iter_node.pos_end,
-                        f"type '{type(iterable).__name__.lower()}' cannot be iterated.",
-                        context,
-                    )
-                )
+                return res.faliure(self.iteration_error(node, iterable, error, context))
 
-            context.symbol_table.set(node.var_name_tok.value, obj)
+            self.store(node.var_name_tok.value, node.location, obj, context)
 
             res.register(self.visit(node.body_node, context))
             
@@ -829,16 +1774,169 @@ class Interpreter:
 
         return res.success(Null().set_context(context))
 
+    def iteration_error(self, node, iterable: DataType, error, context: Context):
+        # Lazy iterables report the errors of the code they run
+        if isinstance(iterable, LazyIterable):
+            return error
+
+        return RTError(
+            node.iter_node.pos_start,
+            node.iter_node.pos_end,
+            f"type '{type(iterable).__name__.lower()}' cannot be iterated.",
+            context,
+        )
+
+    def visit_ComprehensionNode(self, node: ComprehensionNode, context: Context):
+        res = RTResult()
+
+        iterable = res.register(self.visit(node.iter_node, context))
+        if res.should_return():
+            return res
+
+        condition_node = node.condition_node
+        element_node = node.element_node
+        key_node = node.key_node
+
+        # Ranges are counted natively, as in count_range. Without a condition
+        # the length of a range or list is known, so the result is allocated
+        # up front
+        fixed = condition_node is None and key_node is None
+        sized = ()
+        if type(iterable) is Range:
+            items = zip(map(Int, iterable.values), repeat(None))
+            if fixed:
+                sized = iterable.values
+        else:
+            items = iterable
+            if fixed and type(iterable) is List:
+                sized = iterable.elements
+
+        try:
+            elements = [None] * len(sized)
+        except (OverflowError, MemoryError):
+            return res.faliure(
+                RTError(
+                    node.pos_start,
+                    node.pos_end,
+                    "Comprehension result is too large",
+                    context,
+                )
+            )
+        pairs = {}
+        count = 0
+
+        # The comprehension variable lives in a frame of its own, with the
+        # cells of the enclosing frame it reads
+        frame = context.frame
+        cells = tuple(
+            frame.slots[index] if kind == CELL else frame.cells[index]
+            for kind, index in node.free_cells
+        )
+        slots = [None] * node.frame_size
+        for slot in node.cell_slots:
+            slots[slot] = Cell()
+
+        inner = Context(context.display_name, context.parent, context.parent_entry_pos)
+        inner.symbol_table = context.symbol_table
+        inner.frame = Frame(slots, cells)
+
+        var_name = node.var_name_tok.value
+        location = node.location
+        slot = location[1] if location[0] == LOCAL else None
+
+        for obj, error in items:
+            if error:
+                return res.faliure(self.iteration_error(node, iterable, error, context))
+
+            if slot is None:
+                self.store(var_name, location, obj, inner)
+            else:
+                slots[slot] = obj
+
+            if condition_node is not None:
+                condition = res.register(self.visit_value(condition_node, inner))
+                if res.should_return():
+                    return res
+                if not is_true(condition):
+                    continue
+
+            if key_node is not None:
+                key = res.register(self.visit(key_node, inner))
+                if res.should_return():
+                    return res
+
+                key = res.register(self.hash_key(key, key_node, inner))
+                if res.should_return():
+                    return res
+
+            value = res.register(self.visit_value(element_node, inner))
+            if res.should_return():
+                return res
+            value = box(value)
+
+            if key_node is not None:
+                pairs[key] = value
+            elif count < len(elements):
+                elements[count] = value
+                count += 1
+            else:
+                elements.append(value)
+                count += 1
+
+        # A list changed while it was iterated may have fallen short
+        del elements[count:]
+
+        result = List(elements) if key_node is None else Dict(pairs)
+        return res.success(
+            result.set_context(context).set_pos(node.pos_start, node.pos_end)
+        )
+
+    def count_range(self, node: ForNode, range_: Range, context: Context):
+        # Ranges are counted natively, binding each Int straight into the
+        # loop variable's slot
+        res = RTResult()
+        var_name = node.var_name_tok.value
+        location = node.location
+
+        if location is not None and location[0] == LOCAL:
+            slots, slot = context.frame.slots, location[1]
+        else:
+            slots = None
+
+        for i in range_.values:
+            if slots is None:
+                self.store(var_name, location, Int(i), context)
+            else:
+                slots[slot] = Int(i)
+
+            res.register(self.visit(node.body_node, context))
+            if res.should_return():
+                if res.loop_should_break:
+                    break
+                if not res.loop_should_continue:
+                    return res
+
+        return res.success(Null())
+
     def visit_WhileNode(self, node: WhileNode, context: Context):
         res = RTResult()
-        elements = []
+
+        # Only a while expression whose value is used collects its values
+        collect = node.value_used and not node.should_return_null
+        if collect and self.lazy_loops:
+            return res.success(
+                WhileLoop(node, context)
+                .set_context(context)
+                .set_pos(node.pos_start, node.pos_end)
+            )
+        elements = [] if collect else None
 
         while True:
-            condition = res.register(self.visit(node.condition_node, context))
+            condition = res.register(self.visit_value(node.condition_node, context))
             if res.should_return():
                 return res
 
-            if not condition.is_true():
+            if not is_true(condition):
                 break
 
             value = res.register(self.visit(node.body_node, context))
@@ -855,11 +1953,12 @@ class Interpreter:
             if res.loop_should_continue:
                 continue
 
-            elements.append(value)
+            if collect:
+                elements.append(value)
 
         return res.success(
             Null()
-            if node.should_return_null
+            if not collect
             else List(elements)
             .set_context(context)
             .set_pos(node.pos_start, node.pos_end)
@@ -871,14 +1970,28 @@ class Interpreter:
         func_name = node.var_name_tok.value if node.var_name_tok else None
         body_node = node.body_node
         arg_names = [arg_name.value for arg_name in node.arg_name_toks]
-        func_value = (
-            Function(func_name, body_node, arg_names, node.should_auto_return)
-            .set_context(context)
-            .set_pos(node.pos_start, node.pos_end)
+
+        # Capture only the cells the function uses, not the defining frame
+        frame = context.frame
+        cells = tuple(
+            frame.slots[index] if kind == CELL else frame.cells[index]
+            for kind, index in node.free_cells
         )
 
+        func_value = Function(
+            func_name,
+            body_node,
+            arg_names,
+            node.should_auto_return,
+            node.frame_size,
+            node.cell_slots,
+            cells,
+            context.symbol_table,
+            node.is_generator,
+        ).set_pos(node.pos_start, node.pos_end)
+
         if node.var_name_tok:
-            context.symbol_table.set(func_name, func_value)
+            self.store(func_name, node.location, func_value, context)
 
         return res.success(func_value)
 
@@ -886,17 +1999,46 @@ class Interpreter:
         res = RTResult()
         args = []
 
-        value_to_call = res.register(self.visit(node.node_to_call, context))
-        if res.should_return():
-            return res
-        value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
+        # Named callees skip the copy a variable access would make
+        if isinstance(node.node_to_call, VarAccessNode):
+            value_to_call = self.lookup(node.node_to_call, context)
+        else:
+            value_to_call = None
+
+        if value_to_call is None:
+            value_to_call = res.register(self.visit(node.node_to_call, context))
+            if res.should_return():
+                return res
+
+        if type(value_to_call) is BuiltInFunction:
+            return self.call_builtin(node, value_to_call, context)
+
+        value_to_call = (
+            value_to_call.copy()
+            .set_pos(node.pos_start, node.pos_end)
+            .set_context(context)
+        )
 
         for arg_node in node.arg_nodes:
             args.append(res.register(self.visit(arg_node, context)))
             if res.should_return():
                 return res
 
-        return_value = res.register(value_to_call.execute(args))
+        if isinstance(value_to_call, Function):
+            # As with built-ins, a call site only checks its arity the first
+            # time it meets a function
+            if node.checked_callee is not value_to_call.body_node:
+                res.register(value_to_call.check_args(value_to_call.arg_names, args))
+                if res.should_return():
+                    return res
+                node.checked_callee = value_to_call.body_node
+
+            if node.tail and self.tail_calls:
+                return res.success(TailCall(value_to_call, args))
+
+            return_value = res.register(value_to_call.execute(args, checked=True))
+        else:
+            return_value = res.register(value_to_call.execute(args))
         if res.should_return():
             return res
         return_value = (
@@ -906,6 +2048,30 @@ class Interpreter:
         )
         return res.success(return_value)
 
+    def call_builtin(self, node: CallNode, builtin: BuiltInFunction, context: Context):
+        res = RTResult()
+        args = []
+
+        for arg_node in node.arg_nodes:
+            args.append(res.register(self.visit(arg_node, context)))
+            if res.should_return():
+                return res
+
+        # A call site always passes the same number of arguments, so its
+        # arity only needs checking the first time it meets a built-in
+        if node.checked_builtin is not builtin.func:
+            builtin = (
+                builtin.copy()
+                .set_pos(node.pos_start, node.pos_end)
+                .set_context(context)
+            )
+            res.register(builtin.check_args(builtin.arg_names, args))
+            if res.should_return():
+                return res
+            node.checked_builtin = builtin.func
+
+        return builtin.call(args, node.pos_start, node.pos_end, context)
+
     def visit_RangeNode(self, node: RangeNode, context: Context):
         res = RTResult()
         start_value = res.register(self.visit(node.start_value_node, context))
@@ -928,7 +2094,7 @@ class Interpreter:
             or not isinstance(end_value, Int)
             or (step_value and not isinstance(step_value, Int))
         ):
-            return res.failure(
+            return res.faliure(
                 RTError(
                     node.start_value_node.pos_start,
                     node.start_value_node.pos_end,
@@ -937,6 +2103,16 @@ class Interpreter:
                 )
             )
 
+        if step_value is not None and step_value.value == 0:
+            return res.faliure(
+                RTError(
+                    node.step_value_node.pos_start,
+                    node.step_value_node.pos_end,
+                    "Range step cannot be zero",
+                    context,
+                )
+            )
+
         return res.success(Range(start_value, end_value, step_value))
 
     def visit_IfExprNode(self, node: IfExprNode, context: Context):
@@ -967,23 +2143,195 @@ class Interpreter:
 
         return res.success_return(value)
 
+    def visit_YieldNode(self, node: YieldNode, context: Context):
+        # Yields in a function body are run by generate_YieldNode
+        return RTResult().faliure(
+            RTError(
+                node.pos_start,
+                node.pos_end,
+                "'yield' outside of a function",
+                context,
+            )
+        )
+
     def visit_BreakNode(self, node: BreakNode, context: Context):
         return RTResult().success_break()
 
     def visit_ContinueNode(self, node: ContinueNode, context: Context):
         return RTResult().success_continue()
 
+    # GENERATORS
+    # The body of a generator runs as a python generator. Statements that may
+    # hold a yield are walked by the generate_* methods, which yield every
+    # value passed to a cloudy yield and return the RTResult of the statement
+    # once it is done; any other statement is simply visited.
+
+    def generate(self, node, context: Context):
+        method = getattr(self, f"generate_{type(node).__name__}", None)
+        if method is None:
+            return self.visit(node, context)
+        return (yield from method(node, context))
+
+    def generate_YieldNode(self, node: YieldNode, context: Context):
+        res = RTResult()
+
+        if node.node_to_yield:
+            value = res.register(self.visit(node.node_to_yield, context))
+            if res.should_return():
+                return res
+        else:
+            value = Null()
+
+        yield value
+        return res.success(Null())
+
+    def generate_BlockNode(self, node: BlockNode, context: Context):
+        res = RTResult()
+
+        for statement_node in node.statement_nodes:
+            res.register((yield from self.generate(statement_node, context)))
+            if res.should_return():
+                return res
+
+        return res.success(Null())
+
+    def generate_IfNode(self, node: IfNode, context: Context):
+        res = RTResult()
+
+        for condition, expr, _ in node.cases:
+            condition_value = res.register(self.visit_value(condition, context))
+            if res.should_return():
+                return res
+
+            if is_true(condition_value):
+                res.register((yield from self.generate(expr, context)))
+                if res.should_return():
+                    return res
+                return res.success(Null())
+
+        if node.else_case:
+            res.register((yield from self.generate(node.else_case[0], context)))
+            if res.should_return():
+                return res
+
+        return res.success(Null())
+
+    def generate_ForNode(self, node: ForNode, context: Context):
+        res = RTResult()
+
+        iterable = res.register(self.visit(node.iter_node, context))
+        if res.should_return():
+            return res
+
+        for obj, error in iterable:
+            if error:
+                return res.faliure(self.iteration_error(node, iterable, error, context))
+
+            self.store(node.var_name_tok.value, node.location, obj, context)
+
+            res.register((yield from self.generate(node.body_node, context)))
+            if res.loop_should_break:
+                break
+            if res.should_return() and not res.loop_should_continue:
+                return res
+
+        return res.success(Null())
+
+    def generate_WhileNode(self, node: WhileNode, context: Context):
+        res = RTResult()
+
+        while True:
+            condition = res.register(self.visit_value(node.condition_node, context))
+            if res.should_return():
+                return res
+
+            if not is_true(condition):
+                break
+
+            res.register((yield from self.generate(node.body_node, context)))
+            if res.loop_should_break:
+                break
+            if res.should_return() and not res.loop_should_continue:
+                return res
+
+        return res.success(Null())
+
+
+interpreter = Interpreter()
+
+PY_FRAMES_PER_CALL = 40
 
-global_symbol_table = SymbolTable()
-global_symbol_table.set("null", Null())
+# Python frames that recurse through C, like built-ins calling back into cloudy
+# code, take up to about this much C stack each; programs run on a thread with
+# enough of it for the whole recursion limit, which the main thread lacks
+C_STACK_PER_FRAME = 1024
+STACK_THREAD_NAME = "cloudy"
 
 built_ins = [func[8:] for func in dir(BuiltInFunction) if func.startswith("execute_")]
 
-for func_name in built_ins:
-    global_symbol_table.set(func_name, BuiltInFunction(func_name))
+builtin_functions = {func_name: BuiltInFunction(func_name) for func_name in built_ins}
+
+builtin_symbol_table = FrozenSymbolTable({"null": Null(), **builtin_functions})
+
+global_symbol_table = SymbolTable(builtin_symbol_table)
 
 
 def run(fn: str, text: str):
+    return on_large_stack(recursion_limit() * C_STACK_PER_FRAME, run_program, fn, text)
+
+
+def recursion_limit() -> int:
+    # Every cloudy call nests a bounded number of python frames
+    return interpreter.max_call_depth * PY_FRAMES_PER_CALL
+
+
+def on_large_stack(stack_size: int, func, *args):
+    # Calls func on a thread with a stack of stack_size bytes, unless already
+    # on one
+    if threading.current_thread().name == STACK_THREAD_NAME:
+        return func(*args)
+
+    outcome = []
+    done = threading.Event()
+
+    def target():
+        try:
+            outcome.append((func(*args), None))
+        except BaseException as exception:
+            outcome.append((None, exception))
+        finally:
+            done.set()
+
+    default_size = threading.stack_size(stack_size)
+    try:
+        thread = threading.Thread(target=target, name=STACK_THREAD_NAME)
+        thread.start()
+    finally:
+        threading.stack_size(default_size)
+
+    # Ctrl-C only reaches the main thread, which passes it on so the program
+    # stops as it would running on the main thread
+    while not done.is_set():
+        try:
+            done.wait()
+        except KeyboardInterrupt:
+            interrupt(thread)
+    thread.join()
+
+    result, exception = outcome[0]
+    if exception is not None:
+        raise exception
+    return result
+
+
+def interrupt(thread: threading.Thread):
+    # Raises KeyboardInterrupt in thread once it next runs python code
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread.ident), ctypes.py_object(KeyboardInterrupt)
+    )
+
+
+def run_program(fn: str, text: str):
     # Generate Tokens
     text = text.rstrip()
     lexer = Lexer(text, fn)
@@ -1004,23 +2352,81 @@ def run(fn: str, text: str):
 
     ast = parser.parse()
 
-    # AST json
-    generator = Generator()
-    with open("cloudylang/utils/ast.json", "w") as f:
-        json.dump(generator.gen(ast.node), f)
-
     # return ast.node, ast.error
 
     if ast.error:
         return None, ast.error
 
-    # Get Interpreter
-    interpreter = Interpreter()
+    # AST json
+    if interpreter.ast_dump_path:
+        generator = ASTGenerator()
+        with open(interpreter.ast_dump_path, "w") as f:
+            json.dump(generator.gen(ast.node), f)
+
+    # Assign frame slots and closure cells to function locals
+    Resolver().resolve_program(ast.node)
+
+    if interpreter.infer_types:
+        TypeInferrer().infer_program(ast.node)
+
+    # Only scripts read from a file have somewhere to keep their profile
+    persist_profile = interpreter.persist_profiles and os.path.isfile(fn)
+    if persist_profile:
+        load_profile(fn, text, ast.node, builtin_functions)
+
+    default_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(default_limit, recursion_limit()))
+
+    # Interpret
     context = Context("<program>")
     context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node, context)
+    interpreter.program_context = context
+    try:
+        result = interpreter.visit(ast.node, context)
+
+        # A lazy loop ending the program is shown with its values
+        if type(result.value) is WhileLoop:
+            result.value, result.error = result.value.collect()
+    except RecursionError:
+        # Deep nesting the call depth limit does not count, such as
+        # expressions nested thousands of levels deep
+        result = RTResult().faliure(
+            RTError(
+                ast.node.pos_start,
+                ast.node.pos_end,
+                "Maximum recursion depth exceeded",
+                context,
+            )
+        )
+    finally:
+        sys.setrecursionlimit(default_limit)
+
+    if persist_profile:
+        save_profile(fn, text, ast.node, builtin_functions)
 
     if str(result.value) in {"True", "False"}:
         result.value = str(result.value).lower()
 
     return result.value, result.error
+
+
+def type_report(fn: str, text: str):
+    lexer = Lexer(text.rstrip(), fn)
+    tokens, error = lexer.make_tokens()
+
+    if error:
+        return None, error
+
+    if len(tokens) == 1 and tokens[0].matches(TT.EOF, None):
+        return [], None
+
+    ast = Parser(tokens).parse()
+
+    if ast.error:
+        return None, ast.error
+
+    Resolver().resolve_program(ast.node)
+    inferrer = TypeInferrer()
+    inferrer.infer_program(ast.node)
+
+    return inferrer.report(), None
@@ -1,4 +1,4 @@
-from .utils.utils import NON_VALUE_TOKS, SINGLE_CHAR_TOK, Position, TT, DIGITS, LETTERS, KEYWORDS, Token
+from .utils.utils import NON_VALUE_TOKS, SINGLE_CHAR_TOK, Position, TT, DIGITS, LETTERS, KEYWORDS, Token, str_to_int
 from .utils.errors import Error, IllegalCharError, ExpectedCharError, InvalidSyntaxError
 
 LETTERS_DIGITS = LETTERS + DIGITS
@@ -86,17 +86,25 @@ class Lexer:
                         return [], error
                     tokens.append(token)
 
+                case "+":
+                    self.found_indent = False
+                    tokens.append(self.make_double_char_token(TT.PLUS, TT.PLUS_EQ, "="))
+
                 case "*":
                     self.found_indent = False
-                    tokens.append(self.make_double_char_token(TT.MULT, TT.POW, "*"))
+                    tokens.append(self.make_double_char_token(TT.MULT, TT.POW, "*", TT.MULT_EQ, TT.POW_EQ))
 
                 case "-":
                     self.found_indent = False
-                    tokens.append(self.make_double_char_token(TT.MINUS, TT.IN, ">"))
+                    tokens.append(self.make_double_char_token(TT.MINUS, TT.IN, ">", TT.MINUS_EQ))
 
                 case "/":
                     self.found_indent = False
-                    tokens.append(self.make_double_char_token(TT.DIV, TT.FDIV, "/"))
+                    tokens.append(self.make_double_char_token(TT.DIV, TT.FDIV, "/", TT.DIV_EQ, TT.FDIV_EQ))
+
+                case "%":
+                    self.found_indent = False
+                    tokens.append(self.make_double_char_token(TT.MODU, TT.MODU_EQ, "="))
 
                 case "=":
                     self.found_indent = False
@@ -148,7 +156,7 @@ class Lexer:
         if dot_found:
             return Token(TT.FLOAT, float(num_str), pos_start, self.pos), None
         else:
-            return Token(TT.INT, int(num_str), pos_start, self.pos), None
+            return Token(TT.INT, str_to_int(num_str), pos_start, self.pos), None
 
     def make_identifier(self):
         id_str = ""
@@ -182,7 +190,7 @@ class Lexer:
 
         return Token(TT.BANG, pos_start=pos_start, pos_end=self.pos)
 
-    def make_double_char_token(self, default_type, new_type, second_char):
+    def make_double_char_token(self, default_type, new_type, second_char, aug_type=None, new_aug_type=None):
         pos_start = self.pos.copy()
         self.advance()
         tok_type = default_type
@@ -191,6 +199,16 @@ class Lexer:
             self.advance()
             tok_type = new_type
 
+            # Augmented assignment of the two char operator, as in "//="
+            if new_aug_type and self.current_char == "=":
+                self.advance()
+                tok_type = new_aug_type
+
+        # Augmented assignment, as in "-="
+        elif aug_type and self.current_char == "=":
+            self.advance()
+            tok_type = aug_type
+
         return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
 
     def make_string(self, quote:str):
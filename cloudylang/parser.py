@@ -1,7 +1,7 @@
 from .utils.errors import InvalidSyntaxError
 from .lexer import Token
 from .utils.nodes import *
-from .utils.utils import NON_VALUE_TOKS, TT, ParseResult, Token
+from .utils.utils import AUG_ASSIGN_OPS, NON_VALUE_TOKS, TT, ParseResult, Token
 
 class Parser:
     def __init__(self, tokens: list[Token]):
@@ -66,7 +66,7 @@ class Parser:
         # check for EOF
         if self.current_tok.type == TT.EOF:
             return res.success(
-                ListNode([], self.current_tok.pos_start, self.current_tok.pos_end)
+                BlockNode([], self.current_tok.pos_start, self.current_tok.pos_end)
             )
 
         # Checks indents
@@ -146,7 +146,7 @@ class Parser:
 
         self.indent_level -= self.local_indent
         return res.success(
-            ListNode(statements, pos_start, self.current_tok.pos_end.copy())
+            BlockNode(statements, pos_start, self.current_tok.pos_end.copy())
         )
 
     def statement(self):
@@ -167,6 +167,16 @@ class Parser:
 
                     ret_val = ReturnNode(expr, pos_start, self.current_tok.pos_start.copy())
 
+                case "yield":
+                    res.register_advancement()
+                    self.advance()
+
+                    expr = res.try_register(self.expr())
+                    if not expr:
+                        self.reverse(res.to_reverse_count)
+
+                    ret_val = YieldNode(expr, pos_start, self.current_tok.pos_start.copy())
+
                 case "continue":
                     res.register_advancement()
                     self.advance()
@@ -231,23 +241,63 @@ class Parser:
 
                     return res.success(VarAssignNode(var_name_tok, expr))
 
-                case TT.LSQUARE:
+                case op_type if op_type in AUG_ASSIGN_OPS:
                     res.register_advancement()
                     self.advance()
+                    op_tok = self.current_tok
                     res.register_advancement()
                     self.advance()
 
-                    index = res.try_register(self.if_expr())
+                    expr = res.register(self.if_expr())
                     if res.error: return res
 
-                    if self.current_tok.type != TT.RSQUARE:
-                        return res.faliure(
-                            InvalidSyntaxError(
-                                self.current_tok.pos_start, self.current_tok.pos_end, "Expected ']'"
+                    return res.success(
+                        AugAssignNode(VarAccessNode(var_name_tok), op_tok, expr)
+                    )
+
+                case TT.LSQUARE:
+                    res.register_advancement()
+                    self.advance()
+
+                    # Every subscript of the target, as in a[i][j]["k"] = value
+                    indexes = []
+                    while self.current_tok.type == TT.LSQUARE:
+                        res.register_advancement()
+                        self.advance()
+
+                        index = res.try_register(self.if_expr())
+                        if res.error: return res
+
+                        if self.current_tok.type != TT.RSQUARE:
+                            return res.faliure(
+                                InvalidSyntaxError(
+                                    self.current_tok.pos_start, self.current_tok.pos_end, "Expected ']'"
+                                )
                             )
-                        )
+                        indexes.append(index)
+
+                        if self.peek.type != TT.LSQUARE:
+                            break
+                        res.register_advancement()
+                        self.advance()
+
+                    if self.peek.type in AUG_ASSIGN_OPS:
+                        res.register_advancement()
+                        self.advance()
+                        op_tok = self.current_tok
+                        res.register_advancement()
+                        self.advance()
+
+                        expr = res.register(self.if_expr())
+                        if res.error: return res
 
-                    if self.peek.type != TT.EQ:
+                        target = VarAccessNode(var_name_tok)
+                        for index in indexes:
+                            target = IndexNode(target, index)
+
+                        return res.success(AugAssignNode(target, op_tok, expr))
+
+                    elif self.peek.type != TT.EQ:
                         self.reverse(res.advance_count)
                         detected_var = False
                     
@@ -260,7 +310,11 @@ class Parser:
                         expr = res.register(self.var_assign_statement())
                         if res.error: return res
 
-                        return res.success(IndexAssignNode(var_name_tok, index, expr))
+                        data_node = VarAccessNode(var_name_tok)
+                        for index in indexes[:-1]:
+                            data_node = IndexNode(data_node, index)
+
+                        return res.success(IndexAssignNode(data_node, indexes[-1], expr))
 
         if not detected_var:
             expr = res.register(self.if_expr())
@@ -563,6 +617,9 @@ class Parser:
 
             if res.error: return res
 
+            if self.current_tok.matches(TT.KEYWORD, "for"):
+                return self.comprehension(element_nodes[0], None, pos_start, TT.RSQUARE)
+
             while self.current_tok.type == TT.COMMA:
                 res.register_advancement()
                 self.advance()
@@ -582,6 +639,69 @@ class Parser:
 
         return res.success(ListNode(element_nodes, pos_start, self.current_tok.pos_start))
 
+    def comprehension(self, element_node, key_node, pos_start, closing_type):
+        # The "for x -> xs if condition" part of a list or dict comprehension,
+        # up to and including its closing bracket
+        res = ParseResult()
+        res.register_advancement()
+        self.advance()
+
+        if self.current_tok.type != TT.IDENTIFIER:
+            return res.faliure(
+                InvalidSyntaxError(
+                    self.current_tok.pos_start, self.current_tok.pos_end, "Expected identifier"
+                )
+            )
+
+        var_name_tok = self.current_tok
+        res.register_advancement()
+        self.advance()
+
+        if self.current_tok.type != TT.IN:
+            return res.faliure(
+                InvalidSyntaxError(
+                    self.current_tok.pos_start, self.current_tok.pos_end, "Expected '->'"
+                )
+            )
+
+        res.register_advancement()
+        self.advance()
+
+        iter_node = res.register(self.expr())
+        if res.error: return res
+
+        condition_node = None
+        if self.current_tok.matches(TT.KEYWORD, "if"):
+            res.register_advancement()
+            self.advance()
+
+            condition_node = res.register(self.expr())
+            if res.error: return res
+
+        if self.current_tok.type != closing_type:
+            return res.faliure(
+                InvalidSyntaxError(
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected '{NON_VALUE_TOKS[closing_type]}'",
+                )
+            )
+
+        res.register_advancement()
+        self.advance()
+
+        return res.success(
+            ComprehensionNode(
+                element_node,
+                key_node,
+                var_name_tok,
+                iter_node,
+                condition_node,
+                pos_start,
+                self.current_tok.pos_start,
+            )
+        )
+
     def dict_expr(self):
         res = ParseResult()
         pos_start = self.current_tok.pos_start.copy()
@@ -628,6 +748,9 @@ class Parser:
         value = res.register(self.if_expr())
         if res.error: return res
 
+        if self.current_tok.matches(TT.KEYWORD, "for"):
+            return self.comprehension(value, key, pos_start, TT.RCURLY)
+
         key_value_pairs.append((key, value))
 
         while self.current_tok.type in (TT.NEWLINE, TT.SPACE):
@@ -1076,6 +1199,11 @@ class Parser:
             right = res.register(func_b())
             if res.error:
                 return res
-            left = BinOpNode(left, op_tok, right)
+
+            # Keyword operators ("and", "or") may skip their right operand
+            if op_tok.type == TT.KEYWORD:
+                left = LogicalOpNode(left, op_tok, right)
+            else:
+                left = BinOpNode(left, op_tok, right)
 
         return res.success(left)
\ No newline at end of file
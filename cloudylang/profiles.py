@@ -0,0 +1,183 @@
+import hashlib
+import json
+
+from .utils.nodes import *
+from .datatypes.unboxed import BINARY_OPS, FAST_OPS, NONE, UNARY_OPS
+
+# Type feedback persisted between runs of the same script.
+#
+# After a run, the operand types of every quickened operator node and the
+# built-in or function every call site settled on are written to a sidecar
+# file next to the script, tagged with a hash of its source. A later run of
+# the unchanged source specializes those nodes before executing anything.
+# Functions are recorded by their qualified name and where they are defined.
+
+PROFILE_SUFFIX = ".profile"
+
+TYPES = {type_.__name__: type_ for type_ in (int, float, bool, str, NONE)}
+
+
+def profile_path(fn: str) -> str:
+    return fn + PROFILE_SUFFIX
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# Node attributes that point back at a node elsewhere in the tree
+BACK_REFERENCES = {"checked_callee"}
+
+
+def walk(node):
+    # Every AST node under node, including node itself
+    yield node
+
+    for child in children(node):
+        yield from walk(child)
+
+
+def children(node):
+    # The nodes directly under node
+    for name, value in vars(node).items():
+        if name not in BACK_REFERENCES:
+            yield from nodes_in(value)
+
+
+def nodes_in(value):
+    if type(value) in (list, tuple):
+        for item in value:
+            yield from nodes_in(item)
+    elif type(value).__module__ == NumberNode.__module__:
+        yield value
+
+
+def function_defs(node, scope: str = ""):
+    # Every function defined under node, with its name qualified by the
+    # functions it is nested in
+    if isinstance(node, FuncDefNode):
+        name = node.var_name_tok.value if node.var_name_tok else "<anonymous>"
+        scope = f"{scope}.{name}" if scope else name
+        yield scope, node
+
+    for child in children(node):
+        yield from function_defs(child, scope)
+
+
+def profiled_nodes(tree):
+    # Operator and call nodes with a key that is stable for a given source:
+    # their kind, where they start and their order in the tree
+    for index, node in enumerate(walk(tree)):
+        if isinstance(node, BinOpNode):
+            kind = "binop"
+        elif isinstance(node, UnaryOpNode):
+            kind = "unaryop"
+        elif isinstance(node, CallNode):
+            kind = "call"
+        else:
+            continue
+
+        yield f"{kind}:{node.pos_start.idx}:{index}", node
+
+
+def read_profile(fn: str, text: str) -> dict:
+    try:
+        with open(profile_path(fn), "r") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if profile.get("source") != source_hash(text):
+        return {}
+    return profile.get("nodes", {})
+
+
+def load_profile(fn: str, text: str, tree, builtins: dict):
+    nodes = read_profile(fn, text)
+    if not nodes:
+        return
+
+    functions = {
+        (name, definition.pos_start.idx): definition
+        for name, definition in function_defs(tree)
+    }
+
+    for key, node in profiled_nodes(tree):
+        feedback = nodes.get(key)
+        if feedback is None:
+            continue
+
+        if type(node) is BinOpNode:
+            left_type, right_type = (TYPES.get(name) for name in feedback)
+            if left_type is right_type and left_type in FAST_OPS:
+                func = FAST_OPS[left_type].get(node.op)
+            else:
+                func = BINARY_OPS[node.op].get((left_type, right_type))
+
+            if func is not None:
+                node.__class__ = QuickBinOpNode
+                node.func = func
+                node.left_type = left_type
+                node.right_type = right_type
+
+        elif type(node) is UnaryOpNode:
+            operand_type = TYPES.get(feedback[0])
+            func = UNARY_OPS[node.op].get(operand_type)
+
+            if func is not None:
+                node.__class__ = QuickUnaryOpNode
+                node.func = func
+                node.operand_type = operand_type
+
+        elif isinstance(node, CallNode) and len(feedback) == 2:
+            definition = functions.get(tuple(feedback))
+            if definition is None:
+                continue
+
+            # As for built-ins, the arity check is settled up front
+            if len(node.arg_nodes) == len(definition.arg_name_toks):
+                node.checked_callee = definition.body_node
+
+        elif isinstance(node, CallNode):
+            builtin = builtins.get(feedback[0])
+            if builtin is None:
+                continue
+
+            # The arity check a call site does once can be settled up front
+            if len(node.arg_nodes) == len(builtin.arg_names):
+                node.checked_builtin = builtin.func
+
+
+def save_profile(fn: str, text: str, tree, builtins: dict):
+    # Feedback from earlier runs is kept for nodes this run did not reach
+    nodes = read_profile(fn, text)
+    builtin_names = {builtin.func: name for name, builtin in builtins.items()}
+    callees = {
+        definition.body_node: [name, definition.pos_start.idx]
+        for name, definition in function_defs(tree)
+    }
+
+    for key, node in profiled_nodes(tree):
+        # Nodes that missed their guard in this run learn their types afresh
+        if not isinstance(node, CallNode) and node.deopts:
+            nodes.pop(key, None)
+            continue
+
+        if type(node) is QuickBinOpNode:
+            feedback = [node.left_type.__name__, node.right_type.__name__]
+        elif type(node) is QuickUnaryOpNode:
+            feedback = [node.operand_type.__name__]
+        elif isinstance(node, CallNode) and node.checked_callee in callees:
+            feedback = callees[node.checked_callee]
+        elif isinstance(node, CallNode) and node.checked_builtin in builtin_names:
+            feedback = [builtin_names[node.checked_builtin]]
+        else:
+            continue
+
+        nodes[key] = feedback
+
+    try:
+        with open(profile_path(fn), "w") as f:
+            json.dump({"source": source_hash(text), "nodes": nodes}, f)
+    except OSError:
+        pass
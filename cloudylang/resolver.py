@@ -0,0 +1,314 @@
+from .utils.nodes import *
+
+# Kinds of frame locations
+LOCAL = 0  # A slot holding the value itself
+CELL = 1  # A slot holding a cell shared with inner functions
+FREE = 2  # A cell captured from an enclosing function
+
+
+class Scope:
+    def __init__(self, parent=None):
+        self.parent: Scope = parent
+        self.slots: dict[str, int] = {}
+
+        # Slots captured by inner functions
+        self.cells: set[int] = set()
+        # (owner scope, name) -> index among the cells this function captures
+        self.free: dict[tuple, int] = {}
+        # Whether the function contains a yield, making it a generator
+        self.yields = False
+
+    def declare(self, name: str) -> int:
+        return self.slots.setdefault(name, len(self.slots))
+
+    def capture(self, owner, name: str) -> int:
+        return self.free.setdefault((owner, name), len(self.free))
+
+    def location_of(self, name: str) -> tuple:
+        slot = self.slots[name]
+        return (CELL if slot in self.cells else LOCAL, slot)
+
+
+# Assigns frame slots to the locals of every function ahead of execution.
+#
+# Parameters, assigned names, loop variables and nested function names get a
+# fixed slot in their function's frame. A local read by an inner function
+# lives in a cell instead, which the inner function captures when it is
+# defined; only the free variables a function uses (directly or through its
+# own inner functions) are captured. Reads get every location that may hold
+# the name, innermost first. Names outside any function, and reads that find
+# every location empty, are looked up by name in the global symbol table.
+# Comprehensions get a scope and frame of their own, even at the top level.
+class Resolver:
+    def __init__(self):
+        self.scope: Scope = None
+        self.scopes: dict[FuncDefNode | ComprehensionNode, Scope] = {}
+        self.program = None
+
+    def resolve_program(self, node):
+        self.program = node
+
+        # Which locals end up in cells is only known once every inner
+        # function has been seen, so the first pass collects captures and
+        # the second settles the final locations
+        self.resolve(node)
+        self.resolve(node)
+
+    def resolve(self, node):
+        method_name = f"resolve_{type(node).__name__}"
+        method = getattr(self, method_name, self.no_resolve_method)
+        method(node)
+
+    def no_resolve_method(self, node):
+        raise Exception(f"No resolve_{type(node).__name__}")
+
+    def resolve_all(self, nodes):
+        for node in nodes:
+            if node is not None:
+                self.resolve(node)
+
+    def locate(self, name: str) -> tuple:
+        locations = []
+        scope = self.scope
+
+        if scope and name in scope.slots:
+            locations.append(scope.location_of(name))
+
+        owner = scope.parent if scope else None
+        while owner:
+            if name in owner.slots:
+                owner.cells.add(owner.slots[name])
+
+                # Every function in between passes the cell along
+                inner = scope
+                while inner is not owner:
+                    inner.capture(owner, name)
+                    inner = inner.parent
+
+                locations.append((FREE, scope.free[owner, name]))
+            owner = owner.parent
+
+        return tuple(locations)
+
+    def free_cells(self, scope: Scope, outer: Scope) -> tuple:
+        # Where the defining frame keeps each cell the scope captures
+        free_cells = []
+        for owner, name in scope.free:
+            if owner is outer:
+                free_cells.append(owner.location_of(name))
+            else:
+                free_cells.append((FREE, outer.free[owner, name]))
+        return tuple(free_cells)
+
+    def location_of(self, name: str):
+        return self.scope.location_of(name) if self.scope else None
+
+    def mark_tail(self, node):
+        # A call whose result is returned as is can replace the running call
+        if isinstance(node, CallNode):
+            node.tail = True
+        elif isinstance(node, IfExprNode):
+            self.mark_tail(node.then_node)
+            self.mark_tail(node.else_node)
+
+    def mark_discarded(self, node):
+        # A while expression whose values are never used need not keep them
+        if isinstance(node, WhileNode):
+            node.value_used = False
+        elif isinstance(node, IfNode):
+            for _, body, _ in node.cases:
+                self.mark_discarded(body)
+            if node.else_case:
+                self.mark_discarded(node.else_case[0])
+
+    # DECLARATIONS
+
+    def declare(self, node):
+        # Collects the names a function body binds, without entering nested
+        # function bodies, so reads ahead of the first assignment still resolve
+        match node:
+            case VarAssignNode():
+                self.scope.declare(node.var_name_tok.value)
+                self.declare(node.value_node)
+
+            case ForNode():
+                self.scope.declare(node.var_name_tok.value)
+                self.declare(node.iter_node)
+                self.declare(node.body_node)
+
+            case FuncDefNode():
+                if node.var_name_tok:
+                    self.scope.declare(node.var_name_tok.value)
+
+            case ListNode():
+                for element_node in node.element_nodes:
+                    self.declare(element_node)
+
+            case BlockNode():
+                for statement_node in node.statement_nodes:
+                    self.declare(statement_node)
+
+            case IfNode():
+                for condition, body, _ in node.cases:
+                    self.declare(condition)
+                    self.declare(body)
+                if node.else_case:
+                    self.declare(node.else_case[0])
+
+            case WhileNode():
+                self.declare(node.condition_node)
+                self.declare(node.body_node)
+
+            case IndexAssignNode():
+                self.declare(node.value_node)
+
+            case YieldNode():
+                self.scope.yields = True
+
+            case AugAssignNode():
+                if isinstance(node.target, VarAccessNode):
+                    self.scope.declare(node.target.var_name_tok.value)
+                self.declare(node.value_node)
+
+    # NODES
+
+    def resolve_NumberNode(self, node: NumberNode):
+        pass
+
+    resolve_BoolNode = resolve_NumberNode
+    resolve_StringNode = resolve_NumberNode
+    resolve_ContinueNode = resolve_NumberNode
+    resolve_BreakNode = resolve_NumberNode
+
+    def resolve_ListNode(self, node: ListNode):
+        self.resolve_all(node.element_nodes)
+
+    def resolve_BlockNode(self, node: BlockNode):
+        self.resolve_all(node.statement_nodes)
+
+        # Only the last value of the program is shown, by the shell
+        used = node.statement_nodes[-1:] if node is self.program else []
+        for statement_node in node.statement_nodes:
+            if statement_node not in used:
+                self.mark_discarded(statement_node)
+
+    def resolve_DictNode(self, node: DictNode):
+        for key, value in node.key_value_nodes:
+            self.resolve(key)
+            self.resolve(value)
+
+    def resolve_VarAccessNode(self, node: VarAccessNode):
+        node.locations = self.locate(node.var_name_tok.value)
+
+    def resolve_VarAssignNode(self, node: VarAssignNode):
+        self.resolve(node.value_node)
+        node.location = self.location_of(node.var_name_tok.value)
+
+    def resolve_BinOpNode(self, node: BinOpNode):
+        self.resolve(node.left_node)
+        self.resolve(node.right_node)
+
+    resolve_LogicalOpNode = resolve_BinOpNode
+
+    def resolve_UnaryOpNode(self, node: UnaryOpNode):
+        self.resolve(node.node)
+
+    def resolve_IfNode(self, node: IfNode):
+        for condition, body, _ in node.cases:
+            self.resolve(condition)
+            self.resolve(body)
+        if node.else_case:
+            self.resolve(node.else_case[0])
+
+    def resolve_ForNode(self, node: ForNode):
+        self.resolve(node.iter_node)
+        node.location = self.location_of(node.var_name_tok.value)
+        self.resolve(node.body_node)
+        self.mark_discarded(node.body_node)
+
+    def resolve_ComprehensionNode(self, node: ComprehensionNode):
+        self.resolve(node.iter_node)
+
+        # A comprehension runs in a frame of its own, like a function body,
+        # so its variable never touches the names around it
+        outer = self.scope
+        if node not in self.scopes:
+            self.scopes[node] = Scope(outer)
+        self.scope = scope = self.scopes[node]
+
+        scope.declare(node.var_name_tok.value)
+        node.location = scope.location_of(node.var_name_tok.value)
+        self.resolve_all([node.condition_node, node.key_node, node.element_node])
+
+        node.frame_size = len(scope.slots)
+        node.cell_slots = tuple(sorted(scope.cells))
+        node.free_cells = self.free_cells(scope, outer)
+        self.scope = outer
+
+    def resolve_WhileNode(self, node: WhileNode):
+        self.resolve(node.condition_node)
+        self.resolve(node.body_node)
+
+    def resolve_FuncDefNode(self, node: FuncDefNode):
+        if node.var_name_tok:
+            node.location = self.location_of(node.var_name_tok.value)
+
+        outer = self.scope
+        if node not in self.scopes:
+            self.scopes[node] = Scope(outer)
+        self.scope = scope = self.scopes[node]
+
+        for arg_name_tok in node.arg_name_toks:
+            scope.declare(arg_name_tok.value)
+        self.declare(node.body_node)
+        node.is_generator = scope.yields
+
+        if node.should_auto_return:
+            self.mark_tail(node.body_node)
+
+        self.resolve(node.body_node)
+        node.frame_size = len(scope.slots)
+        node.cell_slots = tuple(sorted(scope.cells))
+        node.free_cells = self.free_cells(scope, outer)
+        self.scope = outer
+
+    def resolve_CallNode(self, node: CallNode):
+        self.resolve(node.node_to_call)
+        self.resolve_all(node.arg_nodes)
+
+    def resolve_IndexNode(self, node: IndexNode):
+        self.resolve(node.data_node)
+        self.resolve(node.index_node)
+
+    def resolve_IndexAssignNode(self, node: IndexAssignNode):
+        self.resolve(node.data_node)
+        self.resolve(node.index)
+        self.resolve(node.value_node)
+
+    def resolve_AugAssignNode(self, node: AugAssignNode):
+        self.resolve(node.target)
+        self.resolve(node.value_node)
+        if isinstance(node.target, VarAccessNode):
+            node.location = self.location_of(node.target.var_name_tok.value)
+
+    def resolve_ReturnNode(self, node: ReturnNode):
+        # A generator's return only ends it, so its value is not a call result
+        if self.scope and not self.scope.yields:
+            self.mark_tail(node.node_to_return)
+        self.resolve_all([node.node_to_return])
+
+    def resolve_YieldNode(self, node: YieldNode):
+        self.resolve_all([node.node_to_yield])
+
+    def resolve_DelNode(self, node: DelNode):
+        self.resolve(node.atom)
+
+    def resolve_RangeNode(self, node: RangeNode):
+        self.resolve_all(
+            [node.start_value_node, node.end_value_node, node.step_value_node]
+        )
+
+    def resolve_IfExprNode(self, node: IfExprNode):
+        self.resolve(node.condition_node)
+        self.resolve(node.then_node)
+        self.resolve(node.else_node)
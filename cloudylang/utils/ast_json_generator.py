@@ -1,4 +1,5 @@
 from .nodes import *
+from .utils import int_to_str
 
 class Generator:
 
@@ -16,9 +17,15 @@ class Generator:
         ]
         
     def gen_NumberNode(self, node: NumberNode) -> dict:        
+        value = node.tok.value
+        # Ints past 64 bits are written as strings, exactly; json would print
+        # them with str(), which refuses ones over 4300 digits
+        if type(value) is int and value.bit_length() > 63:
+            value = int_to_str(value)
+
         return {
             "name": "NumberNode",
-            "value": node.tok.value
+            "value": value
         }
 
     def gen_BoolNode(self, node: BoolNode) -> dict:
@@ -41,6 +48,22 @@ class Generator:
             }
         }
 
+    def gen_BlockNode(self, node: BlockNode) -> dict:
+        return {
+            "name": "BlockNode",
+            "statements": self.gen_list(node.statement_nodes)
+        }
+
+    def gen_ComprehensionNode(self, node: ComprehensionNode) -> dict:
+        return {
+            "name": "ComprehensionNode",
+            "element": self.gen(node.element_node),
+            "key": self.gen(node.key_node) if node.key_node else None,
+            "iterator_name": node.var_name_tok.value,
+            "iterator_node": self.gen(node.iter_node),
+            "condition": self.gen(node.condition_node) if node.condition_node else None
+        }
+
     def gen_DictNode(self, node: DictNode):
         return {
             "name": "DictNode",
@@ -82,11 +105,19 @@ class Generator:
     def gen_IndexAssignNode(self, node: IndexAssignNode) -> dict:
         return {
             "name": "IndexAssignNode",
-            "var_name": node.var_name_tok.value,
+            "data_node": self.gen(node.data_node),
             "index_node": self.gen(node.index),
             "value_node": self.gen(node.value_node)
         }
     
+    def gen_AugAssignNode(self, node: AugAssignNode) -> dict:
+        return {
+            "name": "AugAssignNode",
+            "target": self.gen(node.target),
+            "op": repr(node.op_tok),
+            "value_node": self.gen(node.value_node)
+        }
+    
     def gen_FuncDefNode(self, node: FuncDefNode) -> dict:
         return {
             "name": "FuncDefNode",
@@ -136,6 +167,12 @@ class Generator:
             "node_to_return": self.gen(node.node_to_return)
         }
 
+    def gen_YieldNode(self, node: YieldNode) -> dict:
+        return {
+            "name": "YieldNode",
+            "node_to_yield": self.gen(node.node_to_yield) if node.node_to_yield else None
+        }
+
     def gen_ContinueNode(self, node: ContinueNode) -> dict:
         return {
             "name": "ContinueNode"
@@ -160,6 +197,8 @@ class Generator:
             "right_node": self.gen(node.right_node)
         }
 
+    gen_LogicalOpNode = gen_BinOpNode
+
     def gen_UnaryOpNode(self, node: UnaryOpNode) -> dict:
         return {
             "name": "UnaryOpNode",
@@ -1,6 +1,17 @@
 from .utils import Position, string_with_arrows
 
 
+TRACEBACK_REPEATS = 3
+
+
+def collapsed(repeats: int) -> str:
+    # repeats counts the copies that followed the first one
+    hidden = repeats + 1 - TRACEBACK_REPEATS
+    if hidden <= 0:
+        return ""
+    return f"  [Previous line repeated {hidden} more times]\n"
+
+
 class Error:
     def __init__(
         self, pos_start: Position, pos_end: Position, error_name: str, details: str
@@ -44,17 +55,31 @@ class RTError(Error):
         return string
 
     def generate_traceback(self):
-        result = ""
+        lines = []
         pos = self.pos_start
         ctx = self.context
 
         while ctx:
-            result = (
-                f"  File {pos.fn}, line {pos.ln + 1}, in {ctx.display_name}\n" + result
-            )
+            lines.append(f"  File {pos.fn}, line {pos.ln + 1}, in {ctx.display_name}\n")
             pos = ctx.parent_entry_pos
             ctx = ctx.parent
 
+        # Deep recursion repeats the same entry, so runs of it are collapsed
+        result = ""
+        repeats = 0
+        for i, line in enumerate(reversed(lines)):
+            if i and line == previous:
+                repeats += 1
+                if repeats >= TRACEBACK_REPEATS:
+                    continue
+            else:
+                result += collapsed(repeats)
+                repeats = 0
+
+            result += line
+            previous = line
+
+        result += collapsed(repeats)
         return "Traceback (most recent call last):\n" + result
 
 
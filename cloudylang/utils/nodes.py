@@ -1,7 +1,12 @@
-from .utils import Position
+from .utils import AUG_ASSIGN_OPS, TT, Position
 from ..lexer import Token
 
 
+def op_key(op_tok: Token):
+    # Keyword operators ("and", "or", "not") are told apart by value
+    return op_tok.value if op_tok.type == TT.KEYWORD else op_tok.type
+
+
 class NumberNode:
     def __init__(self, tok: Token):
         self.tok = tok
@@ -47,6 +52,19 @@ class ListNode:
         return str(self.element_nodes)
 
 
+class BlockNode:
+    # Statements run one after another, such as a function body or the program
+    def __init__(
+        self, statement_nodes: list[NumberNode], pos_start: Position, pos_end: Position
+    ):
+        self.statement_nodes = statement_nodes
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return str(self.statement_nodes)
+
+
 class DictNode:
     def __init__(
         self,
@@ -59,9 +77,41 @@ class DictNode:
         self.pos_end = pos_end
 
 
+class ComprehensionNode:
+    # [element for var -> iterable if condition], or {key: element for ...}
+    # when key_node is set
+    def __init__(
+        self,
+        element_node: NumberNode,
+        key_node: NumberNode,
+        var_name_tok: Token,
+        iter_node: ListNode,
+        condition_node: NumberNode,
+        pos_start: Position,
+        pos_end: Position,
+    ):
+        self.element_node = element_node
+        self.key_node = key_node
+        self.var_name_tok = var_name_tok
+        self.iter_node = iter_node
+        self.condition_node = condition_node
+        self.location = None  # Set by the resolver
+        self.frame_size = 1  # Set by the resolver
+        self.cell_slots = ()  # Set by the resolver
+        self.free_cells = ()  # Set by the resolver
+
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return f"[{self.element_node} for {self.var_name_tok} -> {self.iter_node}]"
+
+
 class VarAccessNode:
     def __init__(self, var_name_tok: Token):
         self.var_name_tok = var_name_tok
+        self.locations = ()  # Set by the resolver
+        self.cache = None  # Inline cache for global lookups
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.var_name_tok.pos_end
@@ -74,6 +124,7 @@ class VarAssignNode:
     def __init__(self, var_name_tok: Token, value_node: NumberNode):
         self.var_name_tok = var_name_tok
         self.value_node = value_node
+        self.location = None  # Set by the resolver
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.var_name_tok.pos_end
@@ -86,7 +137,9 @@ class BinOpNode:
     def __init__(self, left_node: NumberNode, op_tok: Token, right_node: NumberNode):
         self.left_node = left_node
         self.op_tok = op_tok
+        self.op = op_key(op_tok)
         self.right_node = right_node
+        self.deopts = 0  # Specializations that failed their guard
 
         self.pos_start = self.left_node.pos_start
         self.pos_end = self.right_node.pos_end
@@ -95,10 +148,33 @@ class BinOpNode:
         return f"({self.left_node} {self.op_tok} {self.right_node})"
 
 
+class QuickBinOpNode(BinOpNode):
+    # A BinOpNode the interpreter has specialized in place for the operand
+    # types it kept seeing; func runs on the raw values while they still
+    # match left_type and right_type.
+    func = None
+    left_type = None
+    right_type = None
+
+
+class LogicalOpNode(BinOpNode):
+    # An "and" / "or", which only evaluates its right operand when the left
+    # one does not decide the result
+    pass
+
+
+class TypedBinOpNode(BinOpNode):
+    # A BinOpNode whose operand types type inference has proven; func runs on
+    # the raw values without any type check.
+    func = None
+
+
 class UnaryOpNode:
     def __init__(self, op_tok: Token, node: NumberNode):
         self.op_tok = op_tok
+        self.op = op_key(op_tok)
         self.node = node
+        self.deopts = 0  # Specializations that failed their guard
 
         self.pos_start = self.op_tok.pos_start
         self.pos_end = node.pos_end
@@ -107,6 +183,17 @@ class UnaryOpNode:
         return f"({self.op_tok} {self.node})"
 
 
+class QuickUnaryOpNode(UnaryOpNode):
+    # A UnaryOpNode specialized in place for a single operand type
+    func = None
+    operand_type = None
+
+
+class TypedUnaryOpNode(UnaryOpNode):
+    # A UnaryOpNode whose operand type type inference has proven
+    func = None
+
+
 class IfNode:
     def __init__(
         self,
@@ -133,6 +220,7 @@ class ForNode:
         self.var_name_tok = var_name_tok
         self.body_node = body_node
         self.iter_node = iter_node
+        self.location = None  # Set by the resolver
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.body_node.pos_end
 
@@ -147,6 +235,7 @@ class WhileNode:
         self.condition_node = condition_node
         self.body_node = body_node
         self.should_return_null = shoud_return_null
+        self.value_used = True  # Set by the resolver
 
         self.pos_start = self.condition_node.pos_start
         self.pos_end = self.body_node.pos_end
@@ -167,6 +256,11 @@ class FuncDefNode:
         self.arg_name_toks = arg_name_toks
         self.body_node = body_node
         self.should_auto_return = should_auto_return
+        self.location = None  # Set by the resolver
+        self.frame_size = len(arg_name_toks)  # Set by the resolver
+        self.cell_slots = ()  # Set by the resolver
+        self.free_cells = ()  # Set by the resolver
+        self.is_generator = False  # Set by the resolver
 
         if var_name_tok:
             self.pos_start = self.var_name_tok.pos_start
@@ -185,6 +279,9 @@ class CallNode:
     def __init__(self, node_to_call: FuncDefNode, arg_nodes: list[BinOpNode]):
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
+        self.tail = False  # Set by the resolver
+        self.checked_builtin = None  # Last built-in matched against the arity
+        self.checked_callee = None  # Body of the last function matched likewise
 
         self.pos_start = self.node_to_call.pos_start
 
@@ -209,9 +306,21 @@ class IndexNode:
         return f"({self.data_node}[{self.index_node}])"
 
 
+class TypedIndexNode(IndexNode):
+    # Indexes a value proven to be a list with a value proven to be an int
+    pass
+
+
 class IndexAssignNode:
-    def __init__(self, var_name_tok: Token, index: NumberNode, value_node: NumberNode):
-        self.var_name_tok = var_name_tok
+    def __init__(
+        self,
+        data_node: VarAccessNode,
+        index: NumberNode,
+        value_node: NumberNode,
+    ):
+        # data_node is the variable assigned into, or an IndexNode chain down
+        # to the container for nested targets such as grid[i][j] = value
+        self.data_node = data_node
         self.index = index
         self.value_node = value_node
         self.pos_start = index.pos_start
@@ -221,6 +330,22 @@ class IndexAssignNode:
         return f"({self.index} = {self.value_node})"
 
 
+class AugAssignNode:
+    def __init__(self, target: VarAccessNode, op_tok: Token, value_node: NumberNode):
+        # target is a VarAccessNode, or an IndexNode for targets like xs[i] += 1
+        self.target = target
+        self.op_tok = op_tok
+        self.op = AUG_ASSIGN_OPS[op_tok.type]  # The binary operator applied
+        self.value_node = value_node
+        self.location = None  # Set by the resolver for variable targets
+
+        self.pos_start = self.target.pos_start
+        self.pos_end = self.value_node.pos_end
+
+    def __repr__(self):
+        return f"({self.target} {self.op_tok} {self.value_node})"
+
+
 class ReturnNode:
     def __init__(
         self, node_to_return: NumberNode, pos_start: Position, pos_end: Position
@@ -233,6 +358,18 @@ class ReturnNode:
         return f"(return {self.node_to_return})"
 
 
+class YieldNode:
+    def __init__(
+        self, node_to_yield: NumberNode, pos_start: Position, pos_end: Position
+    ):
+        self.node_to_yield = node_to_yield
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return f"(yield {self.node_to_yield})"
+
+
 class ContinueNode:
     def __init__(self, pos_start: Position, pos_end: Position):
         self.pos_start = pos_start
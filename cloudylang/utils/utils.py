@@ -42,10 +42,15 @@ class TT(Enum):
     RANGE = auto()
     BANG = auto()
     QMARK = auto()
+    PLUS_EQ = auto()
+    MINUS_EQ = auto()
+    MULT_EQ = auto()
+    DIV_EQ = auto()
+    FDIV_EQ = auto()
+    MODU_EQ = auto()
+    POW_EQ = auto()
 
 SINGLE_CHAR_TOK = {
-    "+": TT.PLUS,
-    "%": TT.MODU,
     "(": TT.LPAR,
     ")": TT.RPAR,
     "[": TT.LSQUARE,
@@ -87,6 +92,24 @@ NON_VALUE_TOKS = {
     TT.RANGE: "..",
     TT.BANG: "!",
     TT.QMARK: "?",
+    TT.PLUS_EQ: "+=",
+    TT.MINUS_EQ: "-=",
+    TT.MULT_EQ: "*=",
+    TT.DIV_EQ: "/=",
+    TT.FDIV_EQ: "//=",
+    TT.MODU_EQ: "%=",
+    TT.POW_EQ: "**=",
+}
+
+# Augmented assignment tokens and the binary operator each one applies
+AUG_ASSIGN_OPS = {
+    TT.PLUS_EQ: TT.PLUS,
+    TT.MINUS_EQ: TT.MINUS,
+    TT.MULT_EQ: TT.MULT,
+    TT.DIV_EQ: TT.DIV,
+    TT.FDIV_EQ: TT.FDIV,
+    TT.MODU_EQ: TT.MODU,
+    TT.POW_EQ: TT.POW,
 }
 
 KEYWORDS = [
@@ -104,6 +127,7 @@ KEYWORDS = [
     "break",
     "continue",
     "return",
+    "yield",
     "del",
 ]
 
@@ -170,10 +194,51 @@ def string_with_arrows(text, pos_start, pos_end):
     return result.replace("\t", "")
 
 
+# Since 3.11 python refuses to convert ints longer than a few thousand digits
+# to or from strings, so larger values are converted piecewise.
+INT_STR_CHUNK = 4000
+
+
+def int_to_str(value: int, width: int = 0) -> str:
+    if value < 0:
+        return "-" + int_to_str(-value)
+
+    # log10(2) ~= 0.30103, so this never overestimates the digit count
+    digits = value.bit_length() * 30103 // 100000
+    if digits < INT_STR_CHUNK:
+        return str(value).zfill(width)
+
+    half = digits // 2
+    high, low = divmod(value, 10**half)
+    return int_to_str(high, max(width - half, 0)) + int_to_str(low, half)
+
+
+def str_to_int(text: str) -> int:
+    text = text.strip()
+    if len(text) < INT_STR_CHUNK:
+        return int(text)
+
+    if text[0] in "+-":
+        sign = -1 if text[0] == "-" else 1
+        return sign * str_to_int(text[1:])
+
+    if not text.isdigit():
+        raise ValueError(f"invalid literal for int(): {text[:20]!r}...")
+
+    half = len(text) // 2
+    return str_to_int(text[:-half]) * 10**half + str_to_int(text[-half:])
+
+
 class SymbolTable:
     def __init__(self, parent=None):
         self.symbols = {}
-        self.parent: dict = parent
+        self.parent: SymbolTable = parent
+
+        # Inline caches stay valid while these are unchanged: version moves on
+        # every binding change, names_version only when a name is added or
+        # removed (which is what shadowing a parent's name takes).
+        self.version = 0
+        self.names_version = 0
 
     def get(self, name):
         value = self.symbols.get(name)
@@ -182,10 +247,43 @@ class SymbolTable:
         return value
 
     def set(self, name: str, value):
+        if name not in self.symbols:
+            self.names_version += 1
         self.symbols[name] = value
+        self.version += 1
 
     def remove(self, name):
         del self.symbols[name]
+        self.names_version += 1
+        self.version += 1
+
+
+class FrozenSymbolTable(SymbolTable):
+    # A namespace that never changes after creation, such as the built-ins.
+    # Lookups that land here can be cached until a child table shadows them.
+    def __init__(self, symbols: dict):
+        super().__init__()
+        self.symbols = dict(symbols)
+
+    def set(self, name: str, value):
+        raise Exception(f"Cannot assign '{name}' in a frozen symbol table")
+
+    def remove(self, name):
+        raise Exception(f"Cannot remove '{name}' from a frozen symbol table")
+
+
+class Cell:
+    # A local shared between a frame and the inner functions that use it
+    def __init__(self, value=None):
+        self.value = value
+
+
+class Frame:
+    # Locals of a single function call, indexed by the slots the resolver
+    # assigned; cells are the variables the function captured when defined.
+    def __init__(self, slots: list, cells: tuple = ()):
+        self.slots = slots
+        self.cells = cells
 
 
 class Context:
@@ -194,6 +292,7 @@ class Context:
         self.parent = parent
         self.parent_entry_pos = parent_entry_pos
         self.symbol_table: SymbolTable = None
+        self.frame: Frame = None
 
 
 class RTResult:
@@ -11,7 +11,4 @@ while True:
     if error:
         print(error)
     elif result:
-        if len(result.elements) <= 1:
-            print(result.elements[0])
-        else:
-            print(result)
\ No newline at end of file
+        print(result)
\ No newline at end of file